@@ -0,0 +1,31 @@
+"""Índice trigram para a busca textual de carros
+
+Revision ID: 0001_car_search_trgm
+Revises:
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = '0001_car_search_trgm'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Mesma expressão de models.car_model.car_search_document
+SEARCH_DOCUMENT = "(coalesce(modelo, '') || ' ' || nome || ' ' || marca || ' ' || versao)"
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CONCURRENTLY não roda dentro de transação e não bloqueia escritas na tabela
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS "ix_Carrinhos_search_trgm" '
+            f'ON "Carrinhos" USING gin ({SEARCH_DOCUMENT} gin_trgm_ops)'
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS "ix_Carrinhos_search_trgm"')
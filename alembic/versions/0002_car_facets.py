@@ -0,0 +1,104 @@
+"""Tabela de resumo para facetas de carros por marca, ano e cor
+
+Revision ID: 0002_car_facets
+Revises: 0001_car_search_trgm
+Create Date: 2026-10-18
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = '0002_car_facets'
+down_revision = '0001_car_search_trgm'
+branch_labels = None
+depends_on = None
+
+# Triggers por statement com transition tables: um COPY ou UPDATE em massa
+# atualiza o resumo com uma única agregação, e não linha a linha.
+# Os SELECTs são ordenados pela chave para que statements concorrentes travem
+# as linhas do resumo sempre na mesma ordem (sem deadlock). Só decrementos
+# podem zerar uma faceta, e a limpeza se restringe às chaves do statement.
+APPLY_FUNCTION = '''
+CREATE OR REPLACE FUNCTION carrinhos_facets_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO "Carrinhos_facets" (marca, ano, cor, total)
+        SELECT marca, ano, cor, count(*) FROM new_rows GROUP BY marca, ano, cor
+        ORDER BY marca, ano, cor
+        ON CONFLICT (marca, ano, cor) DO UPDATE SET total = "Carrinhos_facets".total + EXCLUDED.total;
+        RETURN NULL;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO "Carrinhos_facets" (marca, ano, cor, total)
+        SELECT marca, ano, cor, -count(*) FROM old_rows GROUP BY marca, ano, cor
+        ORDER BY marca, ano, cor
+        ON CONFLICT (marca, ano, cor) DO UPDATE SET total = "Carrinhos_facets".total + EXCLUDED.total;
+    ELSE
+        INSERT INTO "Carrinhos_facets" (marca, ano, cor, total)
+        SELECT marca, ano, cor, sum(delta) FROM (
+            SELECT marca, ano, cor, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT marca, ano, cor, -1 AS delta FROM old_rows
+        ) d
+        GROUP BY marca, ano, cor
+        HAVING sum(delta) <> 0
+        ORDER BY marca, ano, cor
+        ON CONFLICT (marca, ano, cor) DO UPDATE SET total = "Carrinhos_facets".total + EXCLUDED.total;
+    END IF;
+    DELETE FROM "Carrinhos_facets" f
+    USING (SELECT DISTINCT marca, ano, cor FROM old_rows) k
+    WHERE f.marca = k.marca AND f.ano = k.ano AND f.cor = k.cor AND f.total <= 0;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+'''
+
+# TRUNCATE não tem transition table nem dispara os triggers de DELETE: zera o
+# resumo inteiro
+TRUNCATE_FUNCTION = '''
+CREATE OR REPLACE FUNCTION carrinhos_facets_truncate() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM "Carrinhos_facets";
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+'''
+
+TRIGGERS = {
+    'carrinhos_facets_insert': (
+        'AFTER INSERT ON "Carrinhos" REFERENCING NEW TABLE AS new_rows', 'carrinhos_facets_apply'),
+    'carrinhos_facets_update': (
+        'AFTER UPDATE ON "Carrinhos" REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+        'carrinhos_facets_apply'),
+    'carrinhos_facets_delete': (
+        'AFTER DELETE ON "Carrinhos" REFERENCING OLD TABLE AS old_rows', 'carrinhos_facets_apply'),
+    'carrinhos_facets_truncate': ('AFTER TRUNCATE ON "Carrinhos"', 'carrinhos_facets_truncate'),
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        'Carrinhos_facets',
+        sa.Column('marca', sa.String(255), primary_key=True),
+        sa.Column('ano', sa.Integer, primary_key=True),
+        sa.Column('cor', sa.String(255), primary_key=True),
+        sa.Column('total', sa.Integer, nullable=False),
+    )
+    op.execute(APPLY_FUNCTION)
+    op.execute(TRUNCATE_FUNCTION)
+    for name, (definition, function) in TRIGGERS.items():
+        op.execute(
+            f'CREATE TRIGGER {name} {definition} '
+            f'FOR EACH STATEMENT EXECUTE FUNCTION {function}()'
+        )
+    op.execute(
+        'INSERT INTO "Carrinhos_facets" (marca, ano, cor, total) '
+        'SELECT marca, ano, cor, count(*) FROM "Carrinhos" GROUP BY marca, ano, cor'
+    )
+
+
+def downgrade() -> None:
+    for name in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {name} ON "Carrinhos"')
+    op.execute('DROP FUNCTION IF EXISTS carrinhos_facets_truncate()')
+    op.execute('DROP FUNCTION IF EXISTS carrinhos_facets_apply()')
+    op.drop_table('Carrinhos_facets')
@@ -0,0 +1,51 @@
+"""Versão por tabela mantida por trigger, para ETag/Last-Modified
+
+Revision ID: 0003_table_versions
+Revises: 0002_car_facets
+Create Date: 2026-10-18
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = '0003_table_versions'
+down_revision = '0002_car_facets'
+branch_labels = None
+depends_on = None
+
+BUMP_FUNCTION = '''
+CREATE OR REPLACE FUNCTION table_versions_bump() RETURNS trigger AS $$
+BEGIN
+    UPDATE table_versions SET version = version + 1, modified_at = clock_timestamp()
+    WHERE name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+'''
+
+# Triggers AFTER disparam em ordem alfabética: "carrinhos_bump_version" roda
+# antes de "carrinhos_facets_*", então a linha de versão é sempre a primeira
+# travada e escritas concorrentes se enfileiram nela, e não nas facetas.
+TRIGGER = (
+    'CREATE TRIGGER carrinhos_bump_version '
+    'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "Carrinhos" '
+    'FOR EACH STATEMENT EXECUTE FUNCTION table_versions_bump()'
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'table_versions',
+        sa.Column('name', sa.String(255), primary_key=True),
+        sa.Column('version', sa.BigInteger, nullable=False),
+        sa.Column('modified_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.execute("INSERT INTO table_versions (name, version, modified_at) VALUES ('Carrinhos', 1, now())")
+    op.execute(BUMP_FUNCTION)
+    op.execute(TRIGGER)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS carrinhos_bump_version ON "Carrinhos"')
+    op.execute('DROP FUNCTION IF EXISTS table_versions_bump()')
+    op.drop_table('table_versions')
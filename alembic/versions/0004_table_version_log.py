@@ -0,0 +1,84 @@
+"""Versão de tabela sem trava compartilhada: marcador por transação
+
+Revision ID: 0004_table_version_log
+Revises: 0003_table_versions
+Create Date: 2026-10-18
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = '0004_table_version_log'
+down_revision = '0003_table_versions'
+branch_labels = None
+depends_on = None
+
+# Em 0003 cada statement de escrita fazia UPDATE na mesma linha de
+# table_versions, que ficava travada até o commit: todas as escritas em
+# Carrinhos se enfileiravam pela transação inteira (update_bulk, importação
+# de Excel...). Agora cada transação insere uma linha própria em
+# table_version_log (chaves distintas não se bloqueiam; statements seguintes
+# da mesma transação caem no ON CONFLICT DO NOTHING da própria linha).
+#
+# A versão é `table_versions.version` + número de linhas no log, ou seja, o
+# total de transações de escrita já commitadas, que muda a cada commit
+# independentemente da ordem. De vez em quando um escritor compacta o log
+# (move as linhas commitadas para `version`); o advisory lock com try faz os
+# demais pularem a compactação em vez de esperar.
+BUMP_FUNCTION = '''
+CREATE OR REPLACE FUNCTION table_versions_bump() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO table_version_log (name, txid, modified_at)
+    VALUES (TG_TABLE_NAME, txid_current(), clock_timestamp())
+    ON CONFLICT (name, txid) DO NOTHING;
+    IF random() < 0.02 AND pg_try_advisory_xact_lock(hashtext('table_versions_compact'), hashtext(TG_TABLE_NAME)) THEN
+        PERFORM table_versions_compact(TG_TABLE_NAME);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+'''
+
+COMPACT_FUNCTION = '''
+CREATE OR REPLACE FUNCTION table_versions_compact(p_name text) RETURNS void AS $$
+BEGIN
+    WITH moved AS (
+        DELETE FROM table_version_log WHERE name = p_name RETURNING modified_at
+    )
+    UPDATE table_versions v
+    SET version = v.version + m.total,
+        modified_at = greatest(v.modified_at, m.modified_at)
+    FROM (SELECT count(*) AS total, max(modified_at) AS modified_at FROM moved) m
+    WHERE v.name = p_name AND m.total > 0;
+END;
+$$ LANGUAGE plpgsql;
+'''
+
+# Versão de 0003, restaurada no downgrade
+OLD_BUMP_FUNCTION = '''
+CREATE OR REPLACE FUNCTION table_versions_bump() RETURNS trigger AS $$
+BEGIN
+    UPDATE table_versions SET version = version + 1, modified_at = clock_timestamp()
+    WHERE name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+'''
+
+
+def upgrade() -> None:
+    op.create_table(
+        'table_version_log',
+        sa.Column('name', sa.String(255), primary_key=True),
+        sa.Column('txid', sa.BigInteger, primary_key=True),
+        sa.Column('modified_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.execute(COMPACT_FUNCTION)
+    op.execute(BUMP_FUNCTION)
+
+
+def downgrade() -> None:
+    op.execute(OLD_BUMP_FUNCTION)
+    op.execute("SELECT table_versions_compact('Carrinhos')")
+    op.execute('DROP FUNCTION IF EXISTS table_versions_compact(text)')
+    op.drop_table('table_version_log')
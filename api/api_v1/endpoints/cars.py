@@ -1,20 +1,32 @@
-from logging import config
 import os
+import hashlib
+import json
 import logging
+import time
 import traceback
-from typing import Any, List, Optional
-from tempfile import NamedTemporaryFile
+from typing import Any, List, Literal, Optional, Tuple
 
-import pandas as pd
-import pdfkit
+import orjson
 from jinja2 import Template
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api import deps
+from core.excel_import import import_excel_stream
+from core.export_stream import (
+    ARROW_MEDIA_TYPE, CSV_MEDIA_TYPE, PARQUET_MEDIA_TYPE, XLSX_MEDIA_TYPE,
+    arrow_schema, stream_arrow, stream_csv, stream_parquet, stream_xlsx,
+)
+from core.pdf_render import PdfRenderService
+from core.http_cache import http_date, not_modified
 from crud.crud_cars import crud_car
-from schemas.car_schema import Car, CarCreate, CarRequest, CarUpdate
+from crud.crud_facets import FACETS, crud_car_facets
+from models.car_model import Car as CarModel
+from schemas.car_schema import (
+    Car, CarBatchGet, CarBulkUpdateItem, CarBulkUpdateResult, CarCreate, CarDeleteMany, CarPage, CarRequest,
+    CarSearch, CarSearchResult, CarUpdate,
+)
 from sqlalchemy import select
 
 
@@ -22,10 +34,24 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 path_wkhtmltopdf = r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe"
-config = pdfkit.configuration(wkhtmltopdf=path_wkhtmltopdf)
+pdf_renderer = PdfRenderService(wkhtmltopdf=path_wkhtmltopdf)
 
 
 
+async def _conditional_headers(request: Request, db: AsyncSession) -> Tuple[dict, bool]:
+    """
+    Build `ETag`/`Last-Modified` from the table version (a primary-key lookup
+    in `table_versions`, shared by all workers) and tell whether the client
+    copy is still valid. Read before the data, so a concurrent write can only
+    make the ETag older than the body, never newer.
+    """
+    token, last_modified = await crud_car.version.current(db)
+    variant = hashlib.md5(f"{request.url.path}?{request.url.query}".encode()).hexdigest()[:8]
+    etag = f'W/"{token}-{variant}"'
+    headers = {"ETag": etag, "Last-Modified": http_date(last_modified), "Cache-Control": "no-cache"}
+    return headers, not_modified(request.headers, etag, last_modified)
+
+
 @router.post("/create", response_model=Car)
 async def create_car(
         car_in: CarCreate,
@@ -44,12 +70,32 @@ async def create_car(
 @router.post("/create-mult", response_model=dict)
 async def create_multi_car(
     car_in: list[CarCreate],
+    mode: Literal["orm", "copy", "returning"] = "orm",
     db: AsyncSession = Depends(deps.get_db_psql),
 ) -> dict:
-    result = await crud_car.create_multi(db=db, obj_in=car_in)
-    return result
+    """
+    Create many cars. `mode` selects the insert path: `orm` (add_all),
+    `copy` (binary COPY, no ids returned) or `returning` (multi-row INSERT ... RETURNING id).
+    """
+    if mode == "orm":
+        return await crud_car.create_multi(db=db, obj_in=car_in)
+    return await crud_car.create_multi_fast(db=db, obj_in=car_in, returning=mode == "returning")
+
 
 
+@router.patch("/bulk", response_model=CarBulkUpdateResult)
+async def bulk_update_cars(
+        items: List[CarBulkUpdateItem],
+        db: AsyncSession = Depends(deps.get_db_psql),
+) -> Any:
+    """
+    Update many cars by id in a single transaction, reporting which ids matched.
+    """
+    try:
+        return await crud_car.update_bulk(db=db, objs_in=items)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
 @router.put("/{id}", response_model=Car)
 async def update_car(
@@ -61,12 +107,9 @@ async def update_car(
     """
     Update an existing car.
     """
-    obj = await crud_car.get(db=db, id=id)
-    if not obj:
+    car = await crud_car.update_returning(db=db, id=id, obj_in=update_data)
+    if not car:
         raise HTTPException(status_code=404, detail="Car not found")
-    
-    
-    car = await crud_car.update(db=db, db_obj=obj, obj_in=update_data)
     return car
 
 @router.delete("/del{id}", response_model=Car)
@@ -78,13 +121,47 @@ async def delete_car(
     """
     Delete an item.
     """
-    car = crud_car.get(db=db, id=id)
+    car = await crud_car.remove_returning(db=db, id=id)
     if not car:
         raise HTTPException(status_code=404, detail="Car not found")
-    car = await crud_car.remove(db=db, id=id)
     return car
 
 
+@router.post("/delete-many", response_model=dict)
+async def delete_many_cars(
+        body: CarDeleteMany,
+        progress: bool = False,
+) -> Any:
+    """
+    Delete cars by id list or by filters, in bounded batches.
+
+    With `progress=true` the response is NDJSON with the running total after
+    each batch, ending with `{"done": true, "deleted": n}`. Invalid filters are
+    rejected with 400 before the stream starts.
+    """
+    filters = [f.dict() for f in body.filters] if body.filters is not None else None
+    try:
+        crud_car.validate_remove_many(ids=body.ids, filters=filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if progress:
+        async def _progress():
+            deleted = 0
+            async with deps.psql_session() as session:
+                async for deleted in crud_car.iter_remove_many(
+                        session, ids=body.ids, filters=filters, batch_size=body.batch_size):
+                    yield json.dumps({"deleted": deleted}) + "\n"
+            yield json.dumps({"done": True, "deleted": deleted}) + "\n"
+
+        return StreamingResponse(_progress(), media_type="application/x-ndjson")
+
+    start = time.perf_counter()
+    async with deps.psql_session() as db:
+        deleted = await crud_car.remove_many(db, ids=body.ids, filters=filters, batch_size=body.batch_size)
+    return {"deleted": deleted, "elapsed_seconds": round(time.perf_counter() - start, 3)}
+
+
 @router.get("/Buscar-carro{id}",response_model=CarRequest)
 async def car_request( 
         id: int,
@@ -93,13 +170,109 @@ async def car_request(
 ) -> Any:
     """
     Retrieve cars.
+
+    Served through the read cache: a change made by another worker (or
+    outside the API) can take up to `crud_car.cache.max_staleness` seconds
+    (60 s with the default per-process cache) to show here.
     """
-    logger.info(f"Consultando carro - filtro por id: {id}")
+    logger.info("Consultando carro - filtro por id: %s", id)
     return await crud_car.get(db=db, id=id)
 
 
+@router.post("/batch-get", response_model=List[Optional[Car]])
+async def batch_get_cars(
+        body: CarBatchGet,
+        db: AsyncSession = Depends(deps.get_db_psql),
+) -> Any:
+    """
+    Retrieve many cars by id in one request. Results follow the order of `ids`,
+    with null for ids that do not exist. Same staleness bound as `/Buscar-carro{id}`.
+    """
+    logger.info("Consultando %s carros por id", len(body.ids))
+    return await crud_car.get_many(db=db, ids=body.ids)
+
+
+@router.post("/search", response_model=CarPage)
+async def search_cars(
+        body: CarSearch,
+        db: AsyncSession = Depends(deps.get_db_psql),
+) -> Any:
+    """
+    Search cars with filters, a mandatory limit and cursor pagination.
+    """
+    logger.info("Buscando carros por filtros")
+    try:
+        items, next_cursor = await crud_car.search(
+            db=db,
+            filters=[f.dict() for f in body.filters],
+            limit=body.limit,
+            cursor=body.cursor,
+            order_by=body.order_by,
+            descending=body.desc,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/search", response_model=List[CarSearchResult])
+async def text_search_cars(
+        q: str = Query(..., min_length=3, max_length=255),
+        limit: int = Query(20, ge=1, le=200),
+        db: AsyncSession = Depends(deps.get_db_psql),
+) -> Any:
+    """
+    Ranked text search over modelo, nome, marca and versao.
+    """
+    logger.info("Busca textual de carros: %r", q)
+    results = await crud_car.text_search(db=db, q=q, limit=limit)
+    return [
+        {**{c.name: getattr(car, c.name) for c in CarModel.__table__.columns}, "rank": rank}
+        for car, rank in results
+    ]
+
+
+@router.get("/search/stats", response_model=list)
+async def search_stats() -> list:
+    """
+    Latency per filter shape used in /search.
+    """
+    return crud_car.filter_plans.stats()
+
+
+@router.get("/facets", response_model=dict)
+async def car_facets(
+        request: Request,
+        response: Response,
+        facets: List[Literal["marca", "ano", "cor"]] = Query(list(FACETS)),
+        marca: Optional[str] = None,
+        ano: Optional[int] = None,
+        cor: Optional[str] = None,
+        db: AsyncSession = Depends(deps.get_db_psql),
+) -> Any:
+    """
+    Car counts by marca, ano and cor, optionally filtered by any of them.
+    Served from the Carrinhos_facets summary table.
+    """
+    headers, is_not_modified = await _conditional_headers(request, db)
+    if is_not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return await crud_car_facets.get_facets(
+        db, facets=facets, filters={"marca": marca, "ano": ano, "cor": cor})
+
+
+@router.get("/cache-stats", response_model=dict)
+async def cache_stats() -> dict:
+    """
+    Hit/miss counters of the single-car lookup cache.
+    """
+    return crud_car.cache.stats() if crud_car.cache else {}
+
+
 @router.get("/", response_model=List[Car])
 async def read_cars(
+        request: Request,
         db: AsyncSession = Depends(deps.get_db_psql),
         skip: int = 0,
         limit: int = 100,
@@ -107,8 +280,33 @@ async def read_cars(
     """
     Retrieve cars.
     """
+    headers, is_not_modified = await _conditional_headers(request, db)
+    if is_not_modified:
+        return Response(status_code=304, headers=headers)
     logger.info("Consultando carros")
-    return await crud_car.get_multi(db=db, skip=skip, limit=limit)
+    rows = await crud_car.get_multi_rows(db=db, skip=skip, limit=limit)
+    # Linhas já têm o formato de `Car`: serializa direto, sem validação/encoder do FastAPI
+    return Response(content=orjson.dumps(rows), media_type="application/json", headers=headers)
+
+
+@router.get("/cursor", response_model=CarPage)
+async def read_cars_cursor(
+        db: AsyncSession = Depends(deps.get_db_psql),
+        cursor: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=1000),
+        order_by: str = "id",
+        desc: bool = False,
+) -> Any:
+    """
+    Retrieve cars using keyset (cursor) pagination.
+    """
+    logger.info("Consultando carros por cursor")
+    try:
+        items, next_cursor = await crud_car.get_multi_cursor(
+            db=db, cursor=cursor, limit=limit, order_by=order_by, descending=desc)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
 
 
 
@@ -116,67 +314,174 @@ async def read_cars(
 @router.post("/import-excel", response_model=dict)
 async def import_excel(
     file: UploadFile = File(...),
+    batch_size: int = Query(1000, ge=1, le=10000),
     db: AsyncSession = Depends(deps.get_db_psql)
 ):
     if not file.filename.endswith(".xlsx"):
         raise HTTPException(status_code=400, detail="O arquivo deve ser .xlsx")
 
     try:
-        df = pd.read_excel(file.file)
-        print("Preview do DF:")
-        print(df.head())
-        print("Colunas:", df.columns)
-                # Valida se colunas necessárias existem
-        required_columns = {"modelo", "nome", "cor", "marca", "versao", "ano"}
-        if not required_columns.issubset(df.columns):
-            raise HTTPException(status_code=400, detail=f"Colunas esperadas: {required_columns}")
-     
-        cars_data: List[CarCreate] = [
-            CarCreate(**row.to_dict()) for _, row in df.iterrows()
-        ]
-        
-        result = await crud_car.create_multi(db=db, obj_in=cars_data)
-        return result
+        return await import_excel_stream(db=db, file=file.file, crud=crud_car, batch_size=batch_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao processar o Excel: {str(e)}")
     
   
-@router.get("/export-excel", response_class=FileResponse)
-async def export_excel(db: AsyncSession = Depends(deps.get_db_psql)):
-    cars = await crud_car.get_all(db)
-    if not cars:
+async def _ensure_has_cars(db: AsyncSession) -> None:
+    result = await db.execute(select(CarModel.id).limit(1))
+    if result.first() is None:
         raise HTTPException(status_code=404, detail="Nenhum carro encontrado.")
 
-    df = pd.DataFrame([car.__dict__ for car in cars])
-    df = df.drop(columns=['_sa_instance_state'], errors='ignore')
 
-    with NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp:
-        df.to_excel(tmp.name, index=False)
-        return FileResponse(tmp.name, filename="carros.xlsx", media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+async def _stream_car_rows(chunk_size: int):
+    async with deps.psql_session() as db:
+        async for rows in crud_car.stream_rows(db, chunk_size=chunk_size):
+            yield rows
 
 
-@router.get("/export-pdf", response_class=FileResponse)
-async def export_pdf(db: AsyncSession = Depends(deps.get_db_psql)):
-    cars = await crud_car.get_all(db)
-    if not cars:
-        raise HTTPException(status_code=404, detail="Nenhum carro encontrado.")
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_cars(
+    after_id: Optional[int] = Query(None, description="Resume after this id (last id received)"),
+    modelo: Optional[str] = None,
+    nome: Optional[str] = None,
+    cor: Optional[str] = None,
+    marca: Optional[str] = None,
+    versao: Optional[str] = None,
+    ano: Optional[int] = None,
+    chunk_size: int = Query(1000, ge=1, le=10000),
+):
+    """
+    Stream every car (optionally filtered by equality) as NDJSON, ordered by id.
+
+    Rows are read from a server-side cursor only as fast as the client consumes
+    them. To resume an interrupted transfer, pass the last received id as `after_id`.
+    """
+    equals = {"modelo": modelo, "nome": nome, "cor": cor, "marca": marca, "versao": versao, "ano": ano}
+    filters = [{"field": k, "operator": "=", "value": v} for k, v in equals.items() if v is not None]
+    columns = [c.name for c in CarModel.__table__.columns]
+
+    async def _ndjson():
+        async with deps.psql_session() as db:
+            async for rows in crud_car.stream_rows(
+                    db, chunk_size=chunk_size, after_id=after_id, filters=filters):
+                yield b"".join(orjson.dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
+
+@router.get("/export-excel", response_class=StreamingResponse)
+async def export_excel(
+    request: Request,
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(deps.get_db_psql),
+):
+    """
+    Export all cars to .xlsx, streamed from a server-side cursor.
+    """
+    headers, is_not_modified = await _conditional_headers(request, db)
+    if is_not_modified:
+        return Response(status_code=304, headers=headers)
+    await _ensure_has_cars(db)
+    columns = [c.name for c in CarModel.__table__.columns]
+    return StreamingResponse(
+        stream_xlsx(columns, _stream_car_rows(chunk_size), sheet="Carros"),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={**headers, "Content-Disposition": 'attachment; filename="carros.xlsx"'},
+    )
 
-    html = """
-    <html>
-    <head><style>table, th, td { border: 1px solid black; border-collapse: collapse; padding: 4px; }</style></head>
-    <body>
-        <h2>Relatorio de Carros</h2>
-        <table>
-            <tr><th>Modelo</th><th>Nome</th><th>Cor</th><th>Marca</th><th>Versão</th><th>Ano</th></tr>
-            %s
-        </table>
-    </body>
-    </html>
-    """ % "".join([
-        f"<tr><td>{c.modelo}</td><td>{c.nome}</td><td>{c.cor}</td><td>{c.marca}</td><td>{c.versao}</td><td>{c.ano}</td></tr>"
-        for c in cars
-    ])
-
-    with NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        pdfkit.from_string(html, tmp.name, configuration=config)
-        return FileResponse(tmp.name, filename="carros.pdf", media_type="application/pdf")
\ No newline at end of file
+
+@router.get("/export-csv", response_class=StreamingResponse)
+async def export_csv(
+    request: Request,
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(deps.get_db_psql),
+):
+    """
+    Export all cars to .csv, streamed from a server-side cursor.
+    """
+    headers, is_not_modified = await _conditional_headers(request, db)
+    if is_not_modified:
+        return Response(status_code=304, headers=headers)
+    await _ensure_has_cars(db)
+    columns = [c.name for c in CarModel.__table__.columns]
+    return StreamingResponse(
+        stream_csv(columns, _stream_car_rows(chunk_size)),
+        media_type=CSV_MEDIA_TYPE,
+        headers={**headers, "Content-Disposition": 'attachment; filename="carros.csv"'},
+    )
+
+
+@router.get("/export-arrow", response_class=StreamingResponse)
+async def export_arrow(
+    request: Request,
+    chunk_size: int = Query(10000, ge=1, le=100000),
+    db: AsyncSession = Depends(deps.get_db_psql),
+):
+    """
+    Export all cars as an Arrow IPC stream, one record batch per chunk.
+    """
+    headers, is_not_modified = await _conditional_headers(request, db)
+    if is_not_modified:
+        return Response(status_code=304, headers=headers)
+    await _ensure_has_cars(db)
+    return StreamingResponse(
+        stream_arrow(arrow_schema(CarModel.__table__), _stream_car_rows(chunk_size)),
+        media_type=ARROW_MEDIA_TYPE,
+        headers={**headers, "Content-Disposition": 'attachment; filename="carros.arrows"'},
+    )
+
+
+@router.get("/export-parquet", response_class=StreamingResponse)
+async def export_parquet(
+    request: Request,
+    chunk_size: int = Query(10000, ge=1, le=100000),
+    db: AsyncSession = Depends(deps.get_db_psql),
+):
+    """
+    Export all cars as Parquet, one row group per chunk.
+    """
+    headers, is_not_modified = await _conditional_headers(request, db)
+    if is_not_modified:
+        return Response(status_code=304, headers=headers)
+    await _ensure_has_cars(db)
+    return StreamingResponse(
+        stream_parquet(arrow_schema(CarModel.__table__), _stream_car_rows(chunk_size)),
+        media_type=PARQUET_MEDIA_TYPE,
+        headers={**headers, "Content-Disposition": 'attachment; filename="carros.parquet"'},
+    )
+
+
+@router.get("/export-pdf", response_class=Response)
+async def export_pdf(request: Request, db: AsyncSession = Depends(deps.get_db_psql)):
+    """
+    Export all cars to PDF, rendered in the PDF worker pool.
+    """
+    headers, is_not_modified = await _conditional_headers(request, db)
+    if is_not_modified:
+        return Response(status_code=304, headers=headers)
+    await _ensure_has_cars(db)
+    pdf = await pdf_renderer.render_table(
+        "Relatorio de Carros",
+        ["Modelo", "Nome", "Cor", "Marca", "Versão", "Ano"],
+        _stream_pdf_rows(db),
+    )
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={**headers, "Content-Disposition": 'attachment; filename="carros.pdf"'},
+    )
+
+
+async def _stream_pdf_rows(db: AsyncSession):
+    async for rows in crud_car.stream_rows(db):
+        # Descarta o id: o relatório mostra apenas os dados do carro
+        yield [row[1:] for row in rows]
+
+
+@router.get("/export-pdf/stats", response_model=dict)
+async def export_pdf_stats() -> dict:
+    """
+    PDF worker pool statistics: queue depth and render times.
+    """
+    return pdf_renderer.stats()
@@ -1,10 +1,17 @@
 import logging
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator, Generator
 
+from core.config import settings
+from core.db_executor import DBThreadExecutor
 from db.session import SessionLocal_212
 from db.session import SessionLocal_211
 from db.session import SessionLocal_psql
 
+# Pools de threads exclusivos de cada SQL Server, usados por CRUDBaseThreaded
+executor_211 = DBThreadExecutor("211", max_workers=settings.SQL_MAX_WORKERS_211)
+executor_212 = DBThreadExecutor("212", max_workers=settings.SQL_MAX_WORKERS_212)
+
 
 async def get_db_psql() -> AsyncGenerator:
     try:
@@ -14,6 +21,19 @@ async def get_db_psql() -> AsyncGenerator:
         await db.close()
 
 
+@asynccontextmanager
+async def psql_session() -> AsyncGenerator:
+    """
+    Sessão para uso fora do ciclo de vida da dependência, como dentro do
+    corpo de uma StreamingResponse, que é consumido após o endpoint retornar.
+    """
+    try:
+        db = SessionLocal_psql()
+        yield db
+    finally:
+        await db.close()
+
+
 def get_db_211() -> Generator:
     try:
         db = SessionLocal_211()
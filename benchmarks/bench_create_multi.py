@@ -0,0 +1,60 @@
+"""
+Benchmark dos caminhos de inserção em massa de CRUDBaseAsync.
+
+Compara linhas/segundo entre `create_multi` (ORM), `create_multi_fast` com
+COPY binário e `create_multi_fast` com INSERT ... RETURNING.
+
+Uso (a partir da raiz do projeto, apontando para um banco de testes):
+
+    python -m benchmarks.bench_create_multi --rows 50000
+
+As linhas inseridas são removidas ao final de cada rodada.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import delete, func, select
+
+from crud.crud_cars import crud_car
+from db.session import SessionLocal_psql
+from models.car_model import Car
+from schemas.car_schema import CarCreate
+
+
+def build_cars(rows: int):
+    return [
+        CarCreate(modelo=f"Modelo {i}", nome=f"Carro {i}", cor="Preto",
+                  marca="Marca", versao="1.0", ano=2000 + i % 25)
+        for i in range(rows)
+    ]
+
+
+async def run_mode(mode: str, cars) -> float:
+    async with SessionLocal_psql() as db:
+        max_id = (await db.execute(select(func.coalesce(func.max(Car.id), 0)))).scalar()
+
+        start = time.perf_counter()
+        if mode == "orm":
+            await crud_car.create_multi(db=db, obj_in=cars)
+        else:
+            await crud_car.create_multi_fast(db=db, obj_in=cars, returning=mode == "returning")
+        elapsed = time.perf_counter() - start
+
+        await db.execute(delete(Car).where(Car.id > max_id))
+        await db.commit()
+    return elapsed
+
+
+async def main(rows: int):
+    cars = build_cars(rows)
+    for mode in ("orm", "copy", "returning"):
+        elapsed = await run_mode(mode, cars)
+        print(f"{mode:>10}: {rows} linhas em {elapsed:.2f}s -> {rows / elapsed:,.0f} linhas/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
@@ -0,0 +1,136 @@
+"""
+Benchmark do impacto do logging no event loop.
+
+Várias tarefas assíncronas logam no padrão do CRUD e do RequestClient
+(mensagem curta + corpo de resposta grande) enquanto uma tarefa mede o atraso
+do event loop. Compara:
+
+* antigo: f-strings e `StreamHandler` síncrono no root (`LOGGING_CONFIG`);
+* fila: formatação preguiçosa, `QueueHandler`/`QueueListener` e truncamento;
+* fila + amostragem: idem, registrando 1 a cada N mensagens de alto volume.
+
+A saída é um stream que demora `--sink-delay` segundos por escrita,
+simulando stdout redirecionado para um coletor de logs lento.
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.bench_logging --tasks 50 --iterations 200 --sink-delay 0.0002
+"""
+import argparse
+import asyncio
+import io
+import logging
+import statistics
+import time
+
+from core.log_queue import QueueLogging
+
+FORMAT = "%(asctime)s %(levelname)s [%(name)s] [%(filename)s:%(lineno)d] - %(message)s"
+
+crud_logger = logging.getLogger("crud.base")
+request_logger = logging.getLogger("core.request")
+
+
+class SlowStream(io.TextIOBase):
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        time.sleep(self.delay)
+        return len(s)
+
+
+def configure_root(stream: SlowStream) -> None:
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(FORMAT))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+async def worker_fstring(iterations: int, body: str, headers: dict):
+    for i in range(iterations):
+        crud_logger.info(f"Obtendo Car de id={i}")
+        request_logger.info(f"Request HEADERS: {headers}")
+        request_logger.info(f"request_success | request_method: get | response_code: 200 | response_body {body}")
+        await asyncio.sleep(0)
+
+
+async def worker_lazy(iterations: int, body: str, headers: dict):
+    for i in range(iterations):
+        crud_logger.info("Obtendo %s de id=%s", "Car", i)
+        request_logger.info("Request HEADERS: %s", headers)
+        request_logger.info("%s | request_method: %s | response_code: %s | response_body %s",
+                            "request_success", "get", 200, body)
+        await asyncio.sleep(0)
+
+
+async def loop_lag(stop: asyncio.Event, samples: list):
+    interval = 0.001
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def run(worker, tasks: int, iterations: int, body: str):
+    headers = {"Authorization": "Bearer x" * 4, "traceparent": "00-abc-def-01"}
+    stop = asyncio.Event()
+    samples: list = []
+    lag_task = asyncio.create_task(loop_lag(stop, samples))
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(iterations, body, headers) for _ in range(tasks)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await lag_task
+    return elapsed, samples
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+async def main(tasks: int, iterations: int, sink_delay: float, body_size: int, sample_every: int, queue_size: int):
+    body = "x" * body_size
+    scenarios = (
+        ("antigo (f-string, StreamHandler)", worker_fstring, None),
+        ("fila (lazy + truncamento)", worker_lazy, QueueLogging(maxsize=queue_size, max_length=2000)),
+        (f"fila + amostragem 1/{sample_every}", worker_lazy,
+         QueueLogging(maxsize=queue_size, max_length=2000, sample_every=sample_every,
+                      sampled_loggers=["crud.base", "core.request"])),
+    )
+    print(f"{tasks} tarefas x {iterations} iterações x 3 mensagens, corpo de {body_size} bytes, "
+          f"saída com {sink_delay * 1000:.2f} ms por escrita")
+    for name, worker, queue_logging in scenarios:
+        stream = SlowStream(sink_delay)
+        configure_root(stream)
+        if queue_logging is not None:
+            queue_logging.start()
+        elapsed, samples = await run(worker, tasks, iterations, body)
+        drain_start = time.perf_counter()
+        dropped = 0
+        if queue_logging is not None:
+            dropped = queue_logging.stats()["dropped_queue_full"]
+            queue_logging.stop()
+        drain = time.perf_counter() - drain_start
+        print(f"{name:>34}: {elapsed:7.3f} s no loop | atraso do loop p50 {statistics.median(samples) * 1000:7.2f} ms"
+              f" p99 {percentile(samples, 0.99) * 1000:7.2f} ms máx {max(samples) * 1000:7.2f} ms"
+              f" | escritas {stream.writes} (fila cheia: {dropped}) | esvaziar fila {drain:.3f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--sink-delay", type=float, default=0.0002, help="Atraso por escrita na saída, em segundos")
+    parser.add_argument("--body-size", type=int, default=16384)
+    parser.add_argument("--sample-every", type=int, default=10)
+    parser.add_argument("--queue-size", type=int, default=100000)
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.iterations, args.sink_delay, args.body_size, args.sample_every,
+                     args.queue_size))
@@ -0,0 +1,101 @@
+"""
+Benchmark da listagem GET /cars: caminho antigo (objetos do ORM + validação
+no schema `Car` + encoder padrão) contra `get_multi_rows` + orjson.
+
+Uso (a partir da raiz do projeto, com ao menos 10k carros no banco):
+
+    python -m benchmarks.bench_read_cars --runs 20
+
+Com `--serialization-only` não usa banco: mede só a serialização, de objetos
+`Car` do ORM montados em memória (TypeAdapter + jsonable_encoder + json)
+contra dicionários no formato de `get_multi_rows` (orjson). A consulta e a
+hidratação das linhas ficam de fora.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from models.car_model import Car as CarModel
+from schemas.car_schema import Car
+
+SIZES = (100, 1000, 10000)
+
+cars_adapter = TypeAdapter(List[Car])
+
+
+def serialize_orm(cars) -> bytes:
+    # O que o FastAPI faz com `response_model=List[Car]`
+    validated = cars_adapter.validate_python(cars, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def serialize_rows(rows) -> bytes:
+    return orjson.dumps(rows)
+
+
+async def orm_path(db, limit: int) -> bytes:
+    from crud.crud_cars import crud_car
+    return serialize_orm(await crud_car.get_multi(db=db, limit=limit))
+
+
+async def rows_path(db, limit: int) -> bytes:
+    from crud.crud_cars import crud_car
+    return serialize_rows(await crud_car.get_multi_rows(db=db, limit=limit))
+
+
+async def timed(fn, db, limit: int, runs: int) -> float:
+    await fn(db, limit)  # aquece caches de statement
+    start = time.perf_counter()
+    for _ in range(runs):
+        await fn(db, limit)
+        db.expunge_all()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def timed_sync(fn, data, runs: int) -> float:
+    fn(data)
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn(data)
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def serialization_only(runs: int) -> None:
+    columns = [c.name for c in CarModel.__table__.columns]
+    for size in SIZES:
+        rows = [
+            {"id": i, "modelo": f"Modelo {i}", "nome": "Civic", "cor": "Prata",
+             "marca": "Honda", "versao": "EXL 2.0", "ano": 2000 + i % 25}
+            for i in range(size)
+        ]
+        rows = [{name: row[name] for name in columns} for row in rows]
+        cars = [CarModel(**row) for row in rows]
+        orm_ms = timed_sync(serialize_orm, cars, runs)
+        rows_ms = timed_sync(serialize_rows, rows, runs)
+        print(f"{size:>6} linhas: ORM {orm_ms:8.2f} ms | rows+orjson {rows_ms:8.2f} ms | {orm_ms / rows_ms:5.1f}x")
+
+
+async def main(runs: int):
+    from db.session import SessionLocal_psql
+    async with SessionLocal_psql() as db:
+        for limit in SIZES:
+            orm_ms = await timed(orm_path, db, limit, runs)
+            rows_ms = await timed(rows_path, db, limit, runs)
+            print(f"{limit:>6} linhas: ORM {orm_ms:8.2f} ms | rows+orjson {rows_ms:8.2f} ms | {orm_ms / rows_ms:5.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--serialization-only", action="store_true", help="Mede só a serialização, sem banco")
+    args = parser.parse_args()
+    if args.serialization_only:
+        serialization_only(args.runs)
+    else:
+        asyncio.run(main(args.runs))
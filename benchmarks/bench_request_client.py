@@ -0,0 +1,101 @@
+"""
+Benchmark do RequestClient contra um servidor stub local (keep-alive).
+
+Compara: um `httpx.AsyncClient` novo por chamada (comportamento antigo),
+o pool compartilhado em série e `gather_requests` com concorrência limitada.
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.bench_request_client --requests 500 --concurrency 20 --latency 0.01
+
+`--latency` simula o tempo de resposta do serviço remoto.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from core.request import RequestClient, gather_requests, http_client_pool
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeçalho e corpo num único envio, sem atraso do Nagle
+    disable_nagle_algorithm = True
+    wbufsize = 1 << 16
+
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        body = json.dumps({"ok": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(port_queue, latency):
+    StubHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+def start_stub_server(latency: float):
+    # Processo separado para o servidor não disputar o GIL com o cliente
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(port_queue, latency), daemon=True)
+    process.start()
+    return process, port_queue.get()
+
+
+async def new_client_per_call(url: str, n: int):
+    for _ in range(n):
+        async with httpx.AsyncClient(timeout=100) as client:
+            (await client.get(url)).json()
+
+
+async def pooled_serial(url: str, n: int):
+    for _ in range(n):
+        await RequestClient("get", url, headers={}).send_api_request()
+
+
+async def pooled_gather(url: str, n: int, concurrency: int):
+    await gather_requests([RequestClient("get", url, headers={}) for _ in range(n)], concurrency=concurrency)
+
+
+async def main(n: int, concurrency: int, latency: float):
+    server, port = start_stub_server(latency)
+    url = f"http://127.0.0.1:{port}/"
+    try:
+        for name, run in (
+            ("cliente novo por chamada", lambda: new_client_per_call(url, n)),
+            ("pool compartilhado, em série", lambda: pooled_serial(url, n)),
+            (f"gather_requests (concorrência {concurrency})", lambda: pooled_gather(url, n, concurrency)),
+        ):
+            start = time.perf_counter()
+            await run()
+            elapsed = time.perf_counter() - start
+            print(f"{name:>36}: {n / elapsed:8.0f} req/s")
+    finally:
+        await http_client_pool.aclose()
+        server.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.01, help="Atraso simulado do servidor, em segundos")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency))
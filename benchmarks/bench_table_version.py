@@ -0,0 +1,61 @@
+"""
+Benchmark da serialização de escritas concorrentes em `Carrinhos`.
+
+Cada tarefa abre uma transação, insere um carro, segura a transação por
+`--hold` segundos (simulando um update_bulk ou uma importação longa) e faz
+rollback. Se as escritas se enfileiram numa trava compartilhada (a linha de
+`table_versions` na migração 0003), o tempo total cresce com o número de
+tarefas (~ tarefas x hold); sem trava compartilhada (0004), fica perto de
+um único `hold`.
+
+`--same-facet` faz todas as tarefas usarem a mesma (marca, ano, cor): aí a
+linha correspondente de `Carrinhos_facets` (0002) as serializa de qualquer
+forma, o que é esperado para escritas na mesma faceta. Use no máximo
+`PSQL_POOL_SIZE` tarefas, senão a espera por conexão entra na medida.
+
+Uso (a partir da raiz do projeto, com as migrações aplicadas):
+
+    python -m benchmarks.bench_table_version --tasks 10 --hold 0.2
+"""
+import argparse
+import asyncio
+import time
+
+from crud.crud_cars import crud_car
+from db.session import SessionLocal_psql
+from models.car_model import Car
+
+
+async def writer(i: int, hold: float, same_facet: bool) -> float:
+    async with SessionLocal_psql() as db:
+        start = time.perf_counter()
+        db.add(Car(modelo='bench', nome='bench', cor='bench', versao='bench',
+                   marca='bench' if same_facet else f'bench-{i}', ano=2000))
+        await db.flush()
+        await asyncio.sleep(hold)
+        await db.rollback()
+        return time.perf_counter() - start
+
+
+async def main(tasks: int, hold: float, same_facet: bool):
+    async with SessionLocal_psql() as db:
+        token_before, _ = await crud_car.version.current(db)
+    start = time.perf_counter()
+    durations = await asyncio.gather(*[writer(i, hold, same_facet) for i in range(tasks)])
+    elapsed = time.perf_counter() - start
+    print(f"{tasks} transações de escrita segurando {hold:.2f} s cada"
+          f"{' (mesma faceta)' if same_facet else ''}: total {elapsed:.2f} s"
+          f" | mais lenta {max(durations):.2f} s | serialização ~{elapsed / hold:.1f}x hold")
+    async with SessionLocal_psql() as db:
+        token_after, _ = await crud_car.version.current(db)
+    # Tudo sofreu rollback: a versão não deve mudar
+    print(f"versão antes {token_before} | depois {token_after}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=10)
+    parser.add_argument("--hold", type=float, default=0.2)
+    parser.add_argument("--same-facet", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.hold, args.same_facet))
@@ -0,0 +1,65 @@
+"""
+Benchmark da busca textual: a mesma consulta (`car_search_document ILIKE
+'%termo%'` com o mesmo LIMIT) com o índice trigram `ix_Carrinhos_search_trgm`
+e sem ele (bitmap/index scans desligados na transação, forçando a varredura
+sequencial). Mostra também o tempo de `CRUDItem.text_search` completo
+(ILIKE ou `%>`, ordenado por similaridade) como referência.
+
+Uso (a partir da raiz do projeto, com a migração 0001_car_search_trgm aplicada):
+
+    python -m benchmarks.bench_text_search --runs 50 --limit 20 civic gol "onix lt"
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.future import select
+
+from crud.crud_cars import crud_car
+from db.session import SessionLocal_psql
+from models.car_model import Car, car_search_document
+
+
+async def timed(fn, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        await fn()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def ilike_stmt(term: str, limit: int):
+    pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    return select(Car.id).where(car_search_document.ilike(pattern)).limit(limit)
+
+
+async def main(terms, runs: int, limit: int):
+    async with SessionLocal_psql() as db:
+        for term in terms:
+            stmt = ilike_stmt(term, limit)
+
+            async def ilike():
+                return (await db.execute(stmt)).all()
+
+            async def trigram():
+                return await crud_car.text_search(db, q=term, limit=limit)
+
+            index_ms = await timed(ilike, runs)
+            # SET LOCAL vale só até o fim da transação
+            await db.execute(text("SET LOCAL enable_bitmapscan = off"))
+            await db.execute(text("SET LOCAL enable_indexscan = off"))
+            scan_ms = await timed(ilike, runs)
+            await db.rollback()
+            trgm_ms = await timed(trigram, runs)
+            await db.rollback()
+            print(f"{term!r:>12}: ilike sem índice {scan_ms:8.2f} ms | com índice {index_ms:8.2f} ms"
+                  f" | {scan_ms / index_ms:5.1f}x | text_search {trgm_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("terms", nargs="*", default=["civic", "gol", "onix"])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.terms, args.runs, args.limit))
@@ -0,0 +1,86 @@
+"""
+Benchmark de renders/segundo do XmlRender.render_xml: implementação antiga
+(Environment, filtros, compilação do template e parser criados a cada chamada)
+contra o Environment compartilhado com templates em cache.
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.bench_xml_render --renders 2000
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader
+from lxml import etree
+
+import core.filters as filters
+from core.xml_render import XmlRender
+
+TEMPLATE = """<envio>
+    <!-- cabeçalho -->
+    <carro>
+        <modelo>{{ modelo | normalize }}</modelo>
+        <nome>{{ nome | normalize_str }}</nome>
+        <marca>{{ marca }}</marca>
+        <ano>{{ ano }}</ano>
+        <preco>{{ preco | comma }}</preco>
+    </carro>
+    {% for opcional in opcionais %}
+    <opcional>{{ opcional.nome }}</opcional>
+    {% endfor %}
+</envio>
+"""
+
+PAYLOAD = {
+    "modelo": "Civic\\tEXL", "nome": "Honda Civic", "marca": "Honda", "ano": 2020, "preco": 129900.5,
+    "opcionais": [{"nome": "Teto solar"}, {"nome": "Câmbio automático"}, {"nome": "Multimídia"}],
+}
+
+
+async def legacy_render_xml(path, template_name, **banklisp):
+    banklisp = await XmlRender.recursively_normalize(banklisp)
+    env = Environment(loader=FileSystemLoader(path))
+    env.filters["normalize"] = filters.strip_line_feed
+    env.filters["normalize_str"] = filters.normalize_str
+    env.filters["format_percent"] = filters.format_percent
+    env.filters["format_datetime"] = filters.format_datetime
+    env.filters["format_date"] = filters.format_date
+    env.filters["comma"] = filters.format_with_comma
+    template = env.get_template(template_name)
+    banklisp = XmlRender.escape(str_xml=banklisp)
+    xml = template.render(**banklisp)
+    parser = etree.XMLParser(remove_blank_text=True, remove_comments=True, strip_cdata=False)
+    root = etree.fromstring(xml, parser=parser)
+    for element in root.iter("*"):
+        if element.text is not None and not element.text.strip():
+            element.text = None
+    return etree.tostring(root, encoding=str)
+
+
+async def measure(render, path, renders: int) -> float:
+    start = time.perf_counter()
+    for _ in range(renders):
+        await render(path, "carro.xml", **{k: (list(v) if isinstance(v, list) else v) for k, v in PAYLOAD.items()})
+    return renders / (time.perf_counter() - start)
+
+
+async def main(renders: int):
+    with tempfile.TemporaryDirectory() as path:
+        Path(path, "carro.xml").write_text(TEMPLATE, encoding="utf-8")
+        assert await legacy_render_xml(path, "carro.xml", **PAYLOAD) == \
+            await XmlRender.render_xml(path, "carro.xml", **PAYLOAD)
+
+        before = await measure(legacy_render_xml, path, renders)
+        after = await measure(XmlRender.render_xml, path, renders)
+        print(f"antes:  {before:10.0f} renders/s")
+        print(f"depois: {after:10.0f} renders/s ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--renders", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.renders))
@@ -0,0 +1,202 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Cache em memória do processo com limite de itens (LRU) e expiração por TTL.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            del self._data[key]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SharedCacheBackend(ABC):
+    """
+    Interface do cache compartilhado entre processos (ex.: Redis).
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> None:
+        ...
+
+
+class LocalSharedCacheBackend(SharedCacheBackend):
+    """
+    Substituto local do cache compartilhado, para desenvolvimento e testes.
+    """
+
+    def __init__(self, maxsize: int = 100000):
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = asyncio.Lock()
+
+    async def get(self, key: str) -> Optional[Any]:
+        async with self._lock:
+            return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        async with self._lock:
+            self._cache.ttl = ttl
+            self._cache.set(key, value)
+
+    async def delete(self, key: str) -> None:
+        async with self._lock:
+            self._cache.delete(key)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        async with self._lock:
+            self._cache.delete_prefix(prefix)
+
+
+class ReadThroughCache:
+    """
+    Cache de leitura em dois níveis: LRU local e, opcionalmente, um backend
+    compartilhado. Guarda dicionários com os valores das colunas.
+
+    Invalidações só chegam ao LRU do processo que fez a escrita. Sem backend
+    compartilhado, outros workers podem servir um valor antigo por até `ttl`
+    segundos. Com backend compartilhado, o LRU local só é usado quando
+    `local_ttl` é informado, e esse passa a ser o limite de desatualização;
+    sem ele, toda leitura vai ao backend.
+
+    Quem lê do banco para preencher o cache pega um `token(key)` antes da
+    leitura e o repassa a `set`: se a chave foi invalidada neste processo
+    enquanto a leitura acontecia, o valor (possivelmente antigo) é descartado
+    em vez de ficar no cache por `ttl` segundos.
+    """
+
+    # Gerações por faixa de hash da chave: tamanho fixo, e uma colisão só faz
+    # descartar um preenchimento a mais
+    generation_slots = 4096
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0, shared: Optional[SharedCacheBackend] = None,
+                 local_ttl: Optional[float] = None):
+        self.shared = shared
+        self.ttl = ttl
+        if shared is None:
+            self.local: Optional[LRUCache] = LRUCache(maxsize=maxsize, ttl=ttl)
+        elif local_ttl:
+            self.local = LRUCache(maxsize=maxsize, ttl=min(local_ttl, ttl))
+        else:
+            self.local = None
+        self.hits = 0
+        self.misses = 0
+        self.skipped_sets = 0
+        self._generations = [0] * self.generation_slots
+        self._epoch = 0
+
+    def _slot(self, key: str) -> int:
+        return hash(key) % self.generation_slots
+
+    def token(self, key: str) -> Tuple[int, int]:
+        """
+        Geração atual de `key`, a ser passada para `set` após ler o valor.
+        """
+        return self._epoch, self._generations[self._slot(key)]
+
+    def _bump(self, key: Optional[str] = None) -> None:
+        if key is None:
+            self._epoch += 1
+        else:
+            self._generations[self._slot(key)] += 1
+
+    @property
+    def max_staleness(self) -> float:
+        """
+        Tempo máximo em que um processo pode servir um valor já invalidado
+        por outro.
+        """
+        return self.local.ttl if self.local is not None else 0.0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.local.get(key) if self.local is not None else None
+        if value is None and self.shared is not None:
+            token = self.token(key)
+            value = await self.shared.get(key)
+            if value is not None and self.local is not None and token == self.token(key):
+                self.local.set(key, value)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any], token: Optional[Tuple[int, int]] = None) -> None:
+        if token is not None and token != self.token(key):
+            self.skipped_sets += 1
+            return
+        if self.local is not None:
+            self.local.set(key, value)
+        if self.shared is not None:
+            await self.shared.set(key, value, self.ttl)
+
+    async def delete(self, key: str) -> None:
+        self._bump(key)
+        if self.local is not None:
+            self.local.delete(key)
+        if self.shared is not None:
+            await self.shared.delete(key)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        self._bump()
+        if self.local is not None:
+            self.local.delete_prefix(prefix)
+        if self.shared is not None:
+            await self.shared.delete_prefix(prefix)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "skipped_sets": self.skipped_sets,
+            "size": len(self.local) if self.local is not None else 0,
+            "maxsize": self.local.maxsize if self.local is not None else 0,
+            "ttl": self.ttl,
+            "max_staleness": self.max_staleness,
+        }
@@ -0,0 +1,82 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DBThreadExecutor:
+    """
+    Pool de threads exclusivo de um banco síncrono (pyodbc/SQL Server).
+
+    Chamadas lentas de um banco ficam limitadas a `max_workers` threads e não
+    ocupam o threadpool padrão do Starlette nem o de outro banco. Mede a
+    espera na fila e a concorrência de cada banco.
+    """
+
+    def __init__(self, name: str, max_workers: int = 8):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'db-{name}')
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._max_running = 0
+        self._calls = 0
+        self._errors = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def _call(self, submitted_at: float, fn, *args, **kwargs):
+        started_at = time.perf_counter()
+        wait = started_at - submitted_at
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._max_running = max(self._max_running, self._running)
+            self._wait_seconds += wait
+            self._max_wait_seconds = max(self._max_wait_seconds, wait)
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._calls += 1
+                self._errors += failed
+                self._run_seconds += time.perf_counter() - started_at
+
+    async def run(self, fn, *args, **kwargs):
+        with self._lock:
+            self._queued += 1
+        call = functools.partial(self._call, time.perf_counter(), fn, *args, **kwargs)
+        future = self._executor.submit(call)
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+
+    def _on_done(self, future) -> None:
+        # Cancelado antes de começar (shutdown ou tarefa cancelada): `_call`
+        # nunca rodou, então a saída da fila é contada aqui
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "queued": self._queued,
+            "running": self._running,
+            "max_running": self._max_running,
+            "calls": self._calls,
+            "errors": self._errors,
+            "avg_wait_seconds": round(self._wait_seconds / self._calls, 6) if self._calls else 0.0,
+            "max_wait_seconds": round(self._max_wait_seconds, 6),
+            "avg_run_seconds": round(self._run_seconds / self._calls, 6) if self._calls else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
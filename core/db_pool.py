@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from typing import Iterable
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolWaitStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Pool padrão do engine assíncrono, medindo o tempo de espera por conexão.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait_stats.record(time.perf_counter() - start)
+
+
+def psql_engine_options(settings) -> dict:
+    """
+    Argumentos de `create_async_engine` para o Postgres a partir do `Settings`:
+
+        engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI_PG, **psql_engine_options(settings))
+    """
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool,
+        "pool_size": settings.PSQL_POOL_SIZE,
+        "max_overflow": settings.PSQL_MAX_OVERFLOW,
+        "pool_timeout": settings.PSQL_POOL_TIMEOUT,
+        "pool_recycle": settings.PSQL_POOL_RECYCLE,
+        "pool_pre_ping": settings.PSQL_POOL_PRE_PING,
+        "connect_args": {
+            "statement_cache_size": settings.PSQL_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.PSQL_PREPARED_STATEMENT_CACHE_SIZE,
+        },
+    }
+
+
+async def _warm_connection(engine: AsyncEngine, cruds: Iterable) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        async with AsyncSession(bind=conn) as db:
+            for crud in cruds:
+                # Executa os mesmos SELECTs de get/get_multi para que fiquem
+                # preparados no cache desta conexão. Escritas ficam de fora:
+                # consumiriam ids da sequence e disparariam os triggers.
+                # Mesmo statement de `get`, sem passar pelo cache de leitura
+                await db.execute(select(crud.model).where(crud.model.id == -1))
+                await crud.get_multi(db, limit=1)
+
+
+async def warm_up_pool(engine: AsyncEngine, cruds: Iterable, connections: int) -> None:
+    """
+    Abre `connections` conexões em paralelo e prepara nelas os statements
+    mais usados, para que as primeiras requisições não paguem esse custo.
+    """
+    start = time.perf_counter()
+    cruds = list(cruds)
+    results = await asyncio.gather(
+        *[_warm_connection(engine, cruds) for _ in range(connections)], return_exceptions=True)
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors:
+        logger.error('Falha ao aquecer o pool de conexões: %s', errors[0])
+    logger.info('Pool aquecido com %s conexões em %.2fs', connections - len(errors), time.perf_counter() - start)
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checkouts": pool_wait_stats.checkouts,
+        "avg_wait_seconds": round(pool_wait_stats.total_wait / pool_wait_stats.checkouts, 6)
+        if pool_wait_stats.checkouts else 0.0,
+        "max_wait_seconds": round(pool_wait_stats.max_wait, 6),
+    }
@@ -66,6 +66,15 @@ class Settings(BaseSettings):
         },
     }
 
+    '''Saída de log numa thread via fila (ver core/log_queue.py)'''
+    LOG_QUEUE_ENABLED: bool = True
+    LOG_QUEUE_MAXSIZE: int = 10000
+    # Mensagens maiores são cortadas (ex.: corpos de requisição/resposta)
+    LOG_MAX_MESSAGE_LENGTH: int = 2000
+    # Registra 1 a cada N mensagens INFO de mesmo template nos loggers abaixo (1 = todas)
+    LOG_SAMPLE_EVERY: int = 1
+    LOG_SAMPLED_LOGGERS: List[str] = ['crud.base', 'crud.base_threaded', 'core.request']
+
     @validator("BACKEND_CORS_ORIGINS", pre=True)
     def assemble_cors_origins(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
         if isinstance(v, str) and not v.startswith("["):
@@ -83,6 +92,17 @@ class Settings(BaseSettings):
     PSQL_PORT: int = 5432
     SQLALCHEMY_DATABASE_URI_PG: Optional[str] = None
 
+    '''Pool de conexões do Postgres (ver core/db_pool.py)'''
+    PSQL_POOL_SIZE: int = 10
+    PSQL_MAX_OVERFLOW: int = 20
+    PSQL_POOL_TIMEOUT: float = 30
+    PSQL_POOL_RECYCLE: int = 1800
+    PSQL_POOL_PRE_PING: bool = True
+    # Cache de statements do próprio asyncpg e de prepared statements do SQLAlchemy
+    PSQL_STATEMENT_CACHE_SIZE: int = 100
+    PSQL_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    PSQL_POOL_WARMUP: bool = True
+
     @validator("SQLALCHEMY_DATABASE_URI_PG", pre=True)
     def assemble_db_connection_psql(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
         if isinstance(v, str):
@@ -105,6 +125,10 @@ class Settings(BaseSettings):
             return v
         return f'mssql+pyodbc://{values.get("SQL_USER_212")}:{values.get("SQL_PASSWORD_212")}@{values.get("SQL_HOST_212")}/{values.get("SQL_DATABASE_212")}?driver=ODBC+Driver+17+for+SQL+Server'
 
+    '''Threads dedicadas por banco SQL Server (ver core/db_executor.py)'''
+    SQL_MAX_WORKERS_212: int = 8
+    SQL_MAX_WORKERS_211: int = 8
+
     SQL_HOST_211: str = ''
     SQL_USER_211: str = ''
     SQL_PASSWORD_211: str = ''
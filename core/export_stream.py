@@ -0,0 +1,201 @@
+import csv
+import io
+import zipfile
+from typing import Any, AsyncIterator, Iterable, List, Sequence
+from xml.sax.saxutils import escape
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import BigInteger, Boolean, Date, DateTime, Float, Integer, Numeric, String, Table
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_MEDIA_TYPE = "text/csv"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{sheet}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_SHEET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_FOOTER = '</sheetData></worksheet>'
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """
+    Destino não-seekable para os writers (zip, Arrow, Parquet): acumula os
+    bytes escritos até serem drenados para a resposta.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        self._position += len(b)
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _xlsx_cell(value: Any) -> str:
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c><v>{value}</v></c>'
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(str(value))}</t></is></c>'
+
+
+def _xlsx_row(values: Iterable[Any]) -> str:
+    return '<row>' + ''.join(_xlsx_cell(v) for v in values) + '</row>'
+
+
+async def stream_xlsx(columns: Sequence[str], chunks: AsyncIterator[Sequence[Sequence[Any]]],
+                      sheet: str = "Sheet1") -> AsyncIterator[bytes]:
+    """
+    Gera um .xlsx (write-only, células inline) a partir de lotes de linhas,
+    emitindo os bytes do zip à medida que cada lote é escrito.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _RELS)
+        zf.writestr("xl/workbook.xml", _WORKBOOK.format(sheet=escape(sheet)))
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        with zf.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as ws:
+            ws.write((_SHEET_HEADER + _xlsx_row(columns)).encode("utf-8"))
+            async for rows in chunks:
+                ws.write("".join(_xlsx_row(row) for row in rows).encode("utf-8"))
+                data = buffer.drain()
+                if data:
+                    yield data
+            ws.write(_SHEET_FOOTER.encode("utf-8"))
+    yield buffer.drain()
+
+
+async def stream_csv(columns: Sequence[str], chunks: AsyncIterator[Sequence[Sequence[Any]]]) -> AsyncIterator[bytes]:
+    """
+    Gera um CSV a partir de lotes de linhas, um pedaço da resposta por lote.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _arrow_type(column_type) -> pa.DataType:
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, BigInteger):
+        return pa.int64()
+    if isinstance(column_type, Integer):
+        return pa.int32()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, Numeric):
+        precision = column_type.precision or 38
+        return pa.decimal128(precision, column_type.scale or 0)
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us", tz="UTC" if column_type.timezone else None)
+    if isinstance(column_type, Date):
+        return pa.date32()
+    if isinstance(column_type, String):
+        return pa.string()
+    raise ValueError(f"Tipo sem equivalente no Arrow: {column_type!r}")
+
+
+def arrow_schema(table: Table) -> pa.Schema:
+    """
+    Schema Arrow com os tipos das colunas da tabela (ex.: `ano` Integer -> int32).
+    """
+    return pa.schema([
+        pa.field(c.name, _arrow_type(c.type), nullable=bool(c.nullable))
+        for c in table.columns
+    ])
+
+
+def _record_batch(schema: pa.Schema, rows: Sequence[Sequence[Any]]) -> pa.RecordBatch:
+    # Transpõe o lote de tuplas em colunas e converte cada coluna de uma vez
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+async def stream_arrow(schema: pa.Schema, chunks: AsyncIterator[Sequence[Sequence[Any]]]) -> AsyncIterator[bytes]:
+    """
+    Gera um Arrow IPC stream com um record batch por lote de linhas.
+    """
+    buffer = _ChunkBuffer()
+    with pa.ipc.new_stream(pa.PythonFile(buffer, mode="w"), schema) as writer:
+        async for rows in chunks:
+            writer.write_batch(_record_batch(schema, rows))
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+async def stream_parquet(schema: pa.Schema, chunks: AsyncIterator[Sequence[Sequence[Any]]]) -> AsyncIterator[bytes]:
+    """
+    Gera um Parquet com um row group por lote de linhas; o rodapé é emitido
+    ao final.
+    """
+    buffer = _ChunkBuffer()
+    with pq.ParquetWriter(pa.PythonFile(buffer, mode="w"), schema, compression="zstd") as writer:
+        async for rows in chunks:
+            writer.write_batch(_record_batch(schema, rows))
+            data = buffer.drain()
+            if data:
+                yield data
+    yield buffer.drain()
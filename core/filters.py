@@ -1,8 +1,27 @@
 from decimal import Decimal
 from datetime import date
 from datetime import datetime
+from functools import lru_cache
 from unicodedata import normalize
 
+# Valores distintos guardados pelas versões memoizadas, usadas valor a valor
+# (ex.: campos repetidos como marca e cor nos payloads de XML)
+CACHE_SIZE = 8192
+
+_LINE_FEED_REMAP = {
+    ord('\t'): ' ',
+    ord('\n'): ' ',
+    ord('\f'): ' ',
+    ord('\r'): None,      # Delete
+}
+_XML_ESCAPE_MAP = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&apos;',
+})
+
 
 def normalize_str(string):
     """
@@ -12,6 +31,9 @@ def normalize_str(string):
         if not isinstance(string, str):
             string = str(string, 'utf-8', 'replace')
 
+        # Texto ASCII já está normalizado
+        if string.isascii():
+            return string
         string = string.encode('utf-8')
         return normalize(
             'NFKD', string.decode('utf-8')).encode('ASCII', 'ignore').decode()
@@ -22,16 +44,63 @@ def strip_line_feed(string):
     if string:
         if not isinstance(string, str):
             string = str(string, 'utf-8', 'replace')
-        remap = {
-            ord('\t'): ' ',
-            ord('\n'): ' ',
-            ord('\f'): ' ',
-            ord('\r'): None,      # Delete
-        }
-        return string.translate(remap).strip()
+        return string.translate(_LINE_FEED_REMAP).strip()
     return string
 
 
+def escape_xml(string):
+    """
+    Escapa os caracteres especiais do XML numa única passada
+    """
+    if not isinstance(string, str):
+        string = str(string, 'utf-8', 'replace')
+    return string.translate(_XML_ESCAPE_MAP)
+
+
+normalize_str_cached = lru_cache(maxsize=CACHE_SIZE)(normalize_str)
+strip_line_feed_cached = lru_cache(maxsize=CACHE_SIZE)(strip_line_feed)
+escape_xml_cached = lru_cache(maxsize=CACHE_SIZE)(escape_xml)
+
+
+def _apply_batch(function, values):
+    """
+    Aplica `function` a uma lista ou pandas Series processando cada valor
+    distinto uma única vez; valores que não são texto são mantidos.
+    """
+    if hasattr(values, 'unique') and hasattr(values, 'map'):
+        mapping = {
+            value: function(value) if isinstance(value, (str, bytes)) else value
+            for value in values.dropna().unique()
+        }
+        return values.map(mapping)
+
+    distinct = dict.fromkeys(values)
+    for value in distinct:
+        distinct[value] = function(value) if isinstance(value, (str, bytes)) else value
+    return [distinct[value] for value in values]
+
+
+def normalize_str_batch(values):
+    """
+    `normalize_str` aplicado a uma lista ou pandas Series
+    """
+    return _apply_batch(normalize_str, values)
+
+
+def strip_line_feed_batch(values):
+    """
+    `strip_line_feed` aplicado a uma lista ou pandas Series
+    """
+    return _apply_batch(strip_line_feed, values)
+
+
+def escape_xml_batch(values):
+    """
+    `escape_xml` aplicado a uma lista ou pandas Series
+    """
+    return _apply_batch(escape_xml, values)
+
+
 def format_percent(value):
     if value:
         return Decimal(value) / 100
@@ -0,0 +1,23 @@
+from email.utils import formatdate, parsedate_to_datetime
+
+
+def not_modified(headers, etag: str, last_modified: float) -> bool:
+    """
+    Avalia `If-None-Match` (prioritário) e `If-Modified-Since` da requisição.
+    """
+    if_none_match = headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(',')]
+        return '*' in tags or etag in tags or etag.removeprefix('W/') in tags
+    if_modified_since = headers.get('if-modified-since')
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
@@ -0,0 +1,158 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+from typing import Dict, Iterable, List, Optional
+
+
+class TruncateFilter(logging.Filter):
+    """
+    Limita o tamanho da mensagem (ex.: corpos de requisição e resposta).
+    Roda nos handlers de saída, ou seja, na thread do listener.
+    """
+
+    def __init__(self, max_length: int = 2000):
+        super().__init__()
+        self.max_length = max_length
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        try:
+            message = record.getMessage()
+        except Exception:
+            # Argumentos inválidos: deixa o handler reportar via handleError
+            return True
+        if len(message) > self.max_length:
+            record.msg = f'{message[:self.max_length]}... [{len(message) - self.max_length} caracteres omitidos]'
+            record.args = None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Registra 1 a cada `every` mensagens de mesmo template (`record.msg`) até
+    o nível `level`; níveis acima (WARNING, ERROR...) passam sempre.
+    """
+
+    max_templates = 1024
+
+    def __init__(self, every: int = 10, level: int = logging.INFO):
+        super().__init__()
+        self.every = every
+        self.level = level
+        self._counts: Dict[str, int] = {}
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every <= 1 or record.levelno > self.level or not isinstance(record.msg, str):
+            return True
+        if len(self._counts) >= self.max_templates:
+            self._counts.clear()
+        count = self._counts.get(record.msg, 0)
+        self._counts[record.msg] = count + 1
+        if count % self.every == 0:
+            return True
+        self.dropped += 1
+        return False
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enfileira o próprio registro, sem formatar a mensagem na thread de quem
+    loga: `msg % args` só é montado pelo listener (argumentos mutáveis saem
+    com o estado do momento da escrita). Com a fila cheia o registro é
+    descartado e contado, em vez de bloquear o event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Espera espaço na fila em vez de falhar com ela cheia
+        self.queue.put(self._sentinel)
+
+
+class QueueLogging:
+    """
+    Move a saída de log para uma thread: os handlers do root configurados
+    por `LOGGING_CONFIG` passam a ser alimentados por um `QueueListener`, e
+    o root fica só com um `LazyQueueHandler`.
+
+    **Parameters**
+
+    * `maxsize`: Tamanho máximo da fila (registros além disso são descartados)
+    * `max_length`: Tamanho máximo de cada mensagem
+    * `sample_every`: Registra 1 a cada N mensagens INFO/DEBUG de mesmo
+      template nos loggers `sampled_loggers` (1 = sem amostragem)
+    * `sampled_loggers`: Loggers de alto volume sujeitos à amostragem
+    """
+
+    def __init__(self, maxsize: int = 10000, max_length: int = 2000, sample_every: int = 1,
+                 sampled_loggers: Iterable[str] = ()):
+        self.maxsize = maxsize
+        self.max_length = max_length
+        self.sample_every = sample_every
+        self.sampled_loggers = list(sampled_loggers)
+        self._lock = threading.Lock()
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._handler: Optional[LazyQueueHandler] = None
+        self._targets: List[logging.Handler] = []
+        self._truncate = TruncateFilter(max_length)
+        self._sampling = SamplingFilter(sample_every)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._listener is not None:
+                return
+            root = logging.getLogger()
+            self._targets = list(root.handlers)
+            for handler in self._targets:
+                handler.addFilter(self._truncate)
+                root.removeHandler(handler)
+
+            log_queue: queue.Queue = queue.Queue(maxsize=self.maxsize)
+            self._handler = LazyQueueHandler(log_queue)
+            root.addHandler(self._handler)
+            for name in self.sampled_loggers:
+                logging.getLogger(name).addFilter(self._sampling)
+
+            self._listener = _QueueListener(log_queue, *self._targets, respect_handler_level=True)
+            self._listener.start()
+        # Garante que a fila seja esvaziada mesmo sem o evento de shutdown
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._listener is None:
+                return
+            self._listener.stop()
+            self._listener = None
+            root = logging.getLogger()
+            root.removeHandler(self._handler)
+            for handler in self._targets:
+                handler.removeFilter(self._truncate)
+                root.addHandler(handler)
+            for name in self.sampled_loggers:
+                logging.getLogger(name).removeFilter(self._sampling)
+
+    def stats(self) -> dict:
+        handler = self._handler
+        return {
+            'running': self._listener is not None,
+            'queued': handler.queue.qsize() if handler else 0,
+            'maxsize': self.maxsize,
+            'dropped_queue_full': handler.dropped if handler else 0,
+            'dropped_sampling': self._sampling.dropped,
+        }
@@ -0,0 +1,180 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from html import escape
+from typing import Any, AsyncIterator, List, Optional, Sequence
+
+import pdfkit
+from pypdf import PdfWriter
+
+logger = logging.getLogger(__name__)
+
+_HTML_PAGE = """
+    <html>
+    <head><meta charset="utf-8"><style>table, th, td {{ border: 1px solid black; border-collapse: collapse; padding: 4px; }}</style></head>
+    <body>
+        {title}
+        <table>
+            <tr>{header}</tr>
+            {rows}
+        </table>
+    </body>
+    </html>
+    """
+
+
+def _render_pdf(html: str, wkhtmltopdf: str) -> bytes:
+    """
+    Executado no processo do pool: renderiza um pedaço do relatório.
+    """
+    configuration = pdfkit.configuration(wkhtmltopdf=wkhtmltopdf)
+    return pdfkit.from_string(html, False, configuration=configuration)
+
+
+def _merge_pdfs(parts: List[bytes]) -> bytes:
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(io.BytesIO(part))
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def build_html(title: Optional[str], header: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    return _HTML_PAGE.format(
+        title=f"<h2>{escape(title)}</h2>" if title else "",
+        header="".join(f"<th>{escape(str(h))}</th>" for h in header),
+        rows="".join(
+            "<tr>" + "".join(f"<td>{escape(str(v))}</td>" for v in row) + "</tr>"
+            for row in rows
+        ),
+    )
+
+
+class PdfRenderService:
+    """
+    Renderização de PDF fora do event loop, num pool de processos limitado.
+
+    Relatórios grandes são divididos em pedaços de `rows_per_chunk` linhas,
+    renderizados em paralelo e concatenados. Quando todos os workers estão
+    ocupados as renderizações aguardam na fila; `stats()` expõe a
+    profundidade da fila e os tempos de renderização.
+    """
+
+    def __init__(self, wkhtmltopdf: str, max_workers: Optional[int] = None, rows_per_chunk: int = 500):
+        self.wkhtmltopdf = wkhtmltopdf
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.rows_per_chunk = rows_per_chunk
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._queued = 0
+        self._running = 0
+        self._submitted = 0
+        self._renders = 0
+        self._render_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._last_report_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: o processo da API já tem threads (listener de log,
+            # executores de banco, threadpool do Starlette) e fork as copiaria
+            # com locks possivelmente presos
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        # Um worker morto (ex.: wkhtmltopdf morto por falta de memória) quebra
+        # o pool inteiro; o próximo envio cria outro
+        if self._executor is executor:
+            logger.warning('Pool de renderização de PDF quebrado; será recriado')
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, fn, *args):
+        self._get_executor()
+        # Referência local: `shutdown` pode zerar `self._semaphore` com
+        # renderizações em andamento
+        semaphore = self._semaphore
+        self._queued += 1
+        queued_at = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            self._queued -= 1
+        # Obtido só agora: o pool pode ter sido recriado durante a espera
+        executor = self._get_executor()
+        started_at = time.perf_counter()
+        self._submitted += 1
+        self._wait_seconds += started_at - queued_at
+        self._running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            raise
+        finally:
+            self._running -= 1
+            semaphore.release()
+            if fn is _render_pdf:
+                self._renders += 1
+                self._render_seconds += time.perf_counter() - started_at
+
+    async def render_html(self, html: str) -> bytes:
+        return await self._submit(_render_pdf, html, self.wkhtmltopdf)
+
+    async def render_table(
+        self, title: str, header: Sequence[str], chunks: AsyncIterator[Sequence[Sequence[Any]]]
+    ) -> bytes:
+        """
+        Renderiza uma tabela recebida em lotes de linhas; cada pedaço de
+        `rows_per_chunk` linhas vira um PDF parcial renderizado em paralelo.
+        """
+        start = time.perf_counter()
+        tasks = []
+        pending: List[Sequence[Any]] = []
+        async for rows in chunks:
+            pending.extend(rows)
+            while len(pending) >= self.rows_per_chunk:
+                page, pending = pending[:self.rows_per_chunk], pending[self.rows_per_chunk:]
+                tasks.append(asyncio.ensure_future(
+                    self.render_html(build_html(title if not tasks else None, header, page))))
+        if pending or not tasks:
+            tasks.append(asyncio.ensure_future(
+                self.render_html(build_html(title if not tasks else None, header, pending))))
+
+        try:
+            parts = await asyncio.gather(*tasks)
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            raise
+        pdf = parts[0] if len(parts) == 1 else await self._submit(_merge_pdfs, parts)
+        self._last_report_seconds = time.perf_counter() - start
+        logger.info('PDF gerado com %s partes em %.2fs', len(parts), self._last_report_seconds)
+        return pdf
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "queued": self._queued,
+            "running": self._running,
+            "renders": self._renders,
+            "avg_render_seconds": round(self._render_seconds / self._renders, 3) if self._renders else 0.0,
+            "avg_wait_seconds": round(self._wait_seconds / self._submitted, 3) if self._submitted else 0.0,
+            "last_report_seconds": round(self._last_report_seconds, 3),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._semaphore = None
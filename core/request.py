@@ -1,40 +1,131 @@
+import asyncio
 import logging
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
 import httpx
 from opentelemetry.propagate import inject
 
-logger = logging.getLogger()
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+
+
+class _ResponseText:
+    """
+    Corpo da resposta decodificado só quando o registro de log é formatado.
+    """
+
+    __slots__ = ('response',)
+
+    def __init__(self, response: httpx.Response):
+        self.response = response
+
+    def __str__(self) -> str:
+        return self.response.text
 
 
 async def log_request_result(prefix, endpoint, method, request_data, res):
     logger.info(
-        f"{prefix} | request_method: {method} | request_url: {endpoint!r} | request_body: {request_data} | response_code: {res.status_code} | response_body {res.text}"
+        "%s | request_method: %s | request_url: %r | request_body: %s | response_code: %s | response_body %s",
+        prefix, method, endpoint, request_data, res.status_code, _ResponseText(res)
     )
 
 
+class HttpClientPool:
+    """
+    Um `httpx.AsyncClient` por host (scheme + host + porta), reaproveitado
+    durante toda a vida da aplicação: conexões keep-alive em vez de um novo
+    handshake TCP/TLS por requisição, com limite de conexões por host.
+    """
+
+    def __init__(self, max_connections_per_host: int = 20, max_keepalive_per_host: int = 10,
+                 keepalive_expiry: float = 30.0):
+        self.limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_per_host,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._clients: Dict[Tuple[str, str, Optional[int]], httpx.AsyncClient] = {}
+
+    def get(self, url: str) -> httpx.AsyncClient:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname or '', parts.port)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=self.limits)
+            self._clients[key] = client
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        await asyncio.gather(*[client.aclose() for client in clients], return_exceptions=True)
+
+
+http_client_pool = HttpClientPool()
+
+
 class RequestClient:
-    def __init__(self, method, url: str, headers, request_data: dict = None, timeout: int = 100) -> None:
+    def __init__(self, method, url: str, headers, request_data: dict = None, timeout: int = 100,
+                 retries: int = 2, backoff: float = 0.5) -> None:
         self.method = method
         self.url = url
         self.request_data = request_data
         self.headers = headers
         self.timeout = timeout
+        # Só métodos idempotentes são repetidos em caso de falha
+        self.retries = retries if method.upper() in IDEMPOTENT_METHODS else 0
+        self.backoff = backoff
         inject(carrier=self.headers)
 
-    async def send_api_request(self):
-        logger.info(f"Sending a {self.method} request to: {self.url}")
-        logger.info(f"Request body/params: {self.request_data}")
-        logger.info(f"Request HEADERS: {self.headers}")
-
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+    async def _send_with_retry(self, client: httpx.AsyncClient) -> httpx.Response:
+        attempt = 0
+        while True:
+            request = client.build_request(self.method.upper(), url=self.url,
+                                           **{f"{'params' if self.method == 'get' else 'json'}": self.request_data},
+                                           headers=self.headers, timeout=self.timeout)
             try:
-                request = httpx.Request(self.method.upper(), url=self.url,
-                                        **{f"{'params' if self.method == 'get' else 'json'}": self.request_data},
-                                        headers=self.headers)
                 response = await client.send(request)
-                response.raise_for_status()
-            except httpx.HTTPStatusError as exc:
-                await log_request_result('request_error', self.url, self.method, self.request_data, response)
-                raise exc
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.retries:
+                    return response
+                await response.aclose()
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    raise
+            delay = self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+            attempt += 1
+            logger.warning("Repetindo %s %s (tentativa %s) em %.2fs", self.method, self.url, attempt, delay)
+            await asyncio.sleep(delay)
+
+    async def send_api_request(self):
+        logger.info("Sending a %s request to: %s", self.method, self.url)
+        logger.info("Request body/params: %s", self.request_data)
+        logger.info("Request HEADERS: %s", self.headers)
+
+        response = await self._send_with_retry(http_client_pool.get(self.url))
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            await log_request_result('request_error', self.url, self.method, self.request_data, response)
+            raise exc
+
+        await log_request_result('request_success', self.url, self.method, self.request_data, response)
+        return response.json()
+
+
+async def gather_requests(requests: Sequence[RequestClient], concurrency: int = 10,
+                          return_exceptions: bool = True) -> List:
+    """
+    Envia várias requisições em paralelo, no máximo `concurrency` ao mesmo
+    tempo, e devolve os resultados na ordem de `requests`. Com
+    `return_exceptions=True` as falhas vêm como exceções na lista.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _send(request: RequestClient):
+        async with semaphore:
+            return await request.send_api_request()
 
-            await log_request_result('request_success', self.url, self.method, self.request_data, response)
-            return response.json()
+    return await asyncio.gather(*[_send(r) for r in requests], return_exceptions=return_exceptions)
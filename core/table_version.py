@@ -0,0 +1,60 @@
+from typing import Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.table_version_model import TableVersionLogRow, TableVersionRow
+
+
+class TableVersion:
+    """
+    Versão de uma tabela lida de `table_versions` e `table_version_log`.
+
+    Um trigger por statement registra um marcador por transação a cada
+    INSERT, UPDATE, DELETE ou TRUNCATE, inclusive em escritas que não passam
+    pelo CRUD. Por isso todos os workers veem a mesma versão. Os marcadores
+    são linhas próprias de cada transação, então escritas concorrentes não
+    disputam nenhuma trava (migração 0004_table_version_log).
+
+    A versão é o número de transações de escrita já commitadas e muda a cada
+    commit, em qualquer ordem. `modified_at` é o horário do statement, não
+    do commit: uma transação longa que termina depois de outra mais curta não
+    avança a data. O ETag (prioritário em `If-None-Match`) continua mudando;
+    só `If-Modified-Since` sem ETag pode responder 304 nessa janela.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    async def current(self, db: AsyncSession) -> Tuple[str, float]:
+        # Uma única consulta: base e marcadores vêm do mesmo snapshot, então a
+        # compactação (que move marcadores para a base) não altera o resultado
+        log = (
+            select(func.count().label('total'), func.max(TableVersionLogRow.modified_at).label('modified_at'))
+            .where(TableVersionLogRow.name == self.name)
+            .subquery()
+        )
+        row = (await db.execute(
+            select(
+                (TableVersionRow.version + log.c.total).label('version'),
+                func.greatest(TableVersionRow.modified_at, log.c.modified_at).label('modified_at'),
+            )
+            .where(TableVersionRow.name == self.name)
+        )).first()
+        if row is None:
+            return '0', 0.0
+        modified_at = row.modified_at.timestamp()
+        # A data entra no token para não repetir ETags se a contagem recomeçar
+        return f'{row.version}.{int(modified_at * 1000):x}', modified_at
+
+    async def bump(self, db: AsyncSession) -> None:
+        """
+        Registra uma escrita na transação de `db`, para escritas que derivam
+        da tabela sem dispará-la (ex.: recálculo da tabela de facetas).
+        """
+        await db.execute(
+            insert(TableVersionLogRow)
+            .values(name=self.name, txid=func.txid_current(), modified_at=func.clock_timestamp())
+            .on_conflict_do_nothing(index_elements=['name', 'txid'])
+        )
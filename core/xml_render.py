@@ -1,25 +1,124 @@
+import asyncio
+import copy
+import multiprocessing
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from lxml import etree
 from lxml import objectify
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 import core.filters as filters
 
+_parsers = threading.local()
+
+
+@lru_cache(maxsize=None)
+def get_environment(path):
+    """
+    Environment único por diretório de templates: filtros registrados uma vez
+    e templates compilados mantidos em memória (e em disco, via bytecode cache).
+    Sem diretório explícito, o Jinja usa um diretório temporário por usuário
+    (0700, com checagem de dono), então ninguém mais consegue plantar
+    bytecode para ser carregado.
+    """
+    env = Environment(
+        loader=FileSystemLoader(path),
+        bytecode_cache=FileSystemBytecodeCache(),
+        auto_reload=False,
+        cache_size=-1,
+    )
+    env.filters["normalize"] = filters.strip_line_feed
+    env.filters["normalize_str"] = filters.normalize_str
+    env.filters["format_percent"] = filters.format_percent
+    env.filters["format_datetime"] = filters.format_datetime
+    env.filters["format_date"] = filters.format_date
+    env.filters["comma"] = filters.format_with_comma
+    return env
+
+
+def get_parser():
+    """
+    Parser lxml reaproveitado por thread (parsers lxml não devem ser
+    compartilhados entre threads).
+    """
+    parser = getattr(_parsers, 'parser', None)
+    if parser is None:
+        parser = etree.XMLParser(remove_blank_text=True, remove_comments=True,
+                                 strip_cdata=False)
+        _parsers.parser = parser
+    return parser
+
+
+def _render_chunk(render_cls, path, template_name, payloads, clean_output):
+    """
+    Executado no processo do pool: renderiza um pedaço do lote. O processo
+    (spawn) importa a classe de novo, com os valores padrão dos atributos;
+    por isso as opções do render chegam como argumentos.
+    """
+    return [render_cls.render_xml_with(path, template_name, payload, clean_output) for payload in payloads]
+
+
+def _record_parser(record_tag):
+    # Só gera eventos para os registros (em qualquer namespace); o restante
+    # do documento é apenas construído e depois liberado
+    return etree.XMLPullParser(events=('end',), tag='{*}' + record_tag,
+                               remove_blank_text=True, remove_comments=True, huge_tree=True)
+
+
+def _sanitize_record(record):
+    """
+    Remove os namespaces do registro e de seus descendentes, no lugar.
+    """
+    for elem in record.iter(etree.Element):
+        i = elem.tag.find('}')
+        if i >= 0:
+            elem.tag = elem.tag[i + 1:]
+    etree.cleanup_namespaces(record)
+    return record
+
+
+def _free(elem):
+    """
+    Libera um registro já consumido e os irmãos anteriores a ele.
+    """
+    elem.clear()
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
 
 class XmlRender:
+    # Reprocessa o XML gerado com lxml para remover espaços e comentários
+    clean_output = True
+    templates_path = os.path.join(os.path.dirname(__file__), 'templates')
+    # Lotes a partir deste tamanho são divididos entre processos
+    parallel_threshold = 200
+    batch_chunk_size = 50
+    max_workers = None
+    _pool = None
 
     @classmethod
-    async def recursively_normalize(cls, vals):
+    def normalize(cls, vals):
+        """
+        Versão síncrona de `recursively_normalize`: o trabalho é só CPU, então
+        a recursão não precisa de awaits.
+        """
         for item in vals:
             if type(vals[item]) is str:
-                vals[item] = vals[item].strip()
-                vals[item] = filters.normalize_str(vals[item])
+                vals[item] = filters.normalize_str_cached(vals[item].strip())
             elif type(vals[item]) is dict:
-                await cls.recursively_normalize(vals[item])
+                cls.normalize(vals[item])
             elif type(vals[item]) is list:
                 for a in vals[item]:
-                    await cls.recursively_normalize(a)
+                    cls.normalize(a)
         return vals
 
+    @classmethod
+    async def recursively_normalize(cls, vals):
+        return cls.normalize(vals)
+
     @classmethod
     async def recursively_normalize_mult(cls, vals):
         if vals is None:
@@ -38,39 +137,95 @@ class XmlRender:
 
     @classmethod
     async def _render(cls, method, **kwargs):
-        path = os.path.join(os.path.dirname(__file__), 'templates')
+        path = cls.templates_path
         xml_send = await cls.render_xml(path, '%s.xml' % method, **kwargs)
         return xml_send.encode('utf-8')
 
     @classmethod
-    async def render_xml(cls, path, template_name, **banklisp):
-        banklisp = await cls.recursively_normalize(banklisp)
-        env = Environment(
-            loader=FileSystemLoader(path))
-        env.filters["normalize"] = filters.strip_line_feed
-        env.filters["normalize_str"] = filters.normalize_str
-        env.filters["format_percent"] = filters.format_percent
-        env.filters["format_datetime"] = filters.format_datetime
-        env.filters["format_date"] = filters.format_date
-        env.filters["comma"] = filters.format_with_comma
-        template = env.get_template(template_name)
+    def render_xml_sync(cls, path, template_name, **banklisp):
+        return cls.render_xml_with(path, template_name, banklisp, cls.clean_output)
+
+    @classmethod
+    def render_xml_with(cls, path, template_name, banklisp, clean_output):
+        """
+        `render_xml_sync` com `clean_output` explícito (usado pelo pool).
+        """
+        banklisp = cls.normalize(banklisp)
+        template = get_environment(path).get_template(template_name)
         banklisp = cls.escape(str_xml=banklisp)
         xml = template.render(**banklisp)
-        parser = etree.XMLParser(remove_blank_text=True, remove_comments=True,
-                                 strip_cdata=False)
-        root = etree.fromstring(xml, parser=parser)
+        if not clean_output:
+            return xml
+        root = etree.fromstring(xml, parser=get_parser())
         for element in root.iter("*"):  # remove espaços em branco
             if element.text is not None and not element.text.strip():
                 element.text = None
         return etree.tostring(root, encoding=str)
 
+    @classmethod
+    async def render_xml(cls, path, template_name, **banklisp):
+        return cls.render_xml_sync(path, template_name, **banklisp)
+
     @classmethod
     async def _render_mult(cls, method, headers, items, **kwargs):
-        path = os.path.join(os.path.dirname(__file__), 'templates')
-        # Aguarda a normalização dos items
-        normalized_items = await cls.recursively_normalize_mult(items)
-        xml_send = await cls.render_xml(path, '%s.xml' % method, headers=headers, items=normalized_items, **kwargs)
-        return xml_send
+        path = cls.templates_path
+        return cls.render_xml_sync(path, '%s.xml' % method, headers=headers, items=items, **kwargs)
+
+    @classmethod
+    def _get_pool(cls):
+        if XmlRender._pool is None:
+            # spawn: não copia as threads (e locks) do processo da API
+            XmlRender._pool = ProcessPoolExecutor(max_workers=cls.max_workers,
+                                                  mp_context=multiprocessing.get_context("spawn"))
+        return XmlRender._pool
+
+    @classmethod
+    def shutdown_pool(cls):
+        if XmlRender._pool is not None:
+            XmlRender._pool.shutdown(wait=False, cancel_futures=True)
+            XmlRender._pool = None
+
+    @classmethod
+    async def iter_render_batch(cls, method, payloads):
+        """
+        Normaliza e renderiza vários payloads do template `method`, entregando
+        os XMLs na ordem de `payloads` assim que cada um fica pronto.
+
+        Lotes pequenos são renderizados no próprio processo; a partir de
+        `parallel_threshold` itens o lote é dividido em pedaços de
+        `batch_chunk_size` e distribuído num pool de processos. Nos dois
+        casos os payloads de quem chama não são alterados.
+        """
+        path = cls.templates_path
+        template_name = '%s.xml' % method
+        if len(payloads) < cls.parallel_threshold:
+            for payload in payloads:
+                # `normalize` altera dicts e listas aninhados no lugar; o pool
+                # trabalha em cópias (pickle), então aqui também
+                yield cls.render_xml_sync(path, template_name, **copy.deepcopy(payload))
+            return
+
+        loop = asyncio.get_running_loop()
+        pool = cls._get_pool()
+        futures = [
+            loop.run_in_executor(pool, _render_chunk, cls, path, template_name,
+                                 payloads[i:i + cls.batch_chunk_size], cls.clean_output)
+            for i in range(0, len(payloads), cls.batch_chunk_size)
+        ]
+        try:
+            for future in futures:
+                for xml in await future:
+                    yield xml
+        finally:
+            for future in futures:
+                future.cancel()
+
+    @classmethod
+    async def render_batch(cls, method, payloads):
+        """
+        Como `iter_render_batch`, devolvendo a lista completa.
+        """
+        return [xml async for xml in cls.iter_render_batch(method, payloads)]
 
     @classmethod
     async def sanitize_response(cls, response):
@@ -86,13 +241,50 @@ class XmlRender:
         objectify.deannotate(tree, cleanup_namespaces=True)
         return response, objectify.fromstring(etree.tostring(tree))
 
+    @classmethod
+    def iter_sanitized_records(cls, chunks, record_tag):
+        """
+        Lê a resposta em pedaços (bytes) com parsing incremental e entrega,
+        um de cada vez, os elementos `record_tag` (nome local) já sem
+        namespaces. Depois que o consumidor avança, o registro e os irmãos já
+        processados são liberados, mantendo a memória limitada ao registro
+        atual. Quem precisar guardar um registro deve copiá-lo.
+        """
+        parser = _record_parser(record_tag)
+
+        def _records():
+            for _, elem in parser.read_events():
+                yield _sanitize_record(elem)
+                _free(elem)
+
+        if isinstance(chunks, (bytes, str)):
+            chunks = [chunks]
+        for chunk in chunks:
+            parser.feed(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            yield from _records()
+        parser.close()
+        yield from _records()
+
+    @classmethod
+    async def aiter_sanitized_records(cls, chunks, record_tag):
+        """
+        Versão assíncrona de `iter_sanitized_records`, para corpos lidos com
+        `httpx.Response.aiter_bytes()`.
+        """
+        parser = _record_parser(record_tag)
+        async for chunk in chunks:
+            parser.feed(chunk)
+            for _, elem in parser.read_events():
+                yield _sanitize_record(elem)
+                _free(elem)
+        parser.close()
+        for _, elem in parser.read_events():
+            yield _sanitize_record(elem)
+            _free(elem)
+
     @classmethod
     def escape(cls, str_xml):
         for key in list(str_xml):
             if type(str_xml[key]) == str:
-                str_xml[key] = str_xml[key].replace("&", "&amp;")
-                str_xml[key] = str_xml[key].replace("<", "&lt;")
-                str_xml[key] = str_xml[key].replace(">", "&gt;")
-                str_xml[key] = str_xml[key].replace("\"", "&quot;")
-                str_xml[key] = str_xml[key].replace("'", "&apos;")
+                str_xml[key] = filters.escape_xml_cached(str_xml[key])
         return str_xml
@@ -2,25 +2,37 @@ from turtle import pd
 from fastapi import HTTPException, UploadFile
 from sqlalchemy.orm import Session
 import logging
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, AsyncIterator, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import desc, update
+from sqlalchemy import any_, bindparam, column, delete, insert, update, values
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.future import select
+from sqlalchemy.orm import make_transient_to_detached
 from crud import crud_cars
 from db.base_class import Base
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.concurrency import run_in_threadpool
 
+from core.cache import ReadThroughCache
+from core.table_version import TableVersion
+from crud.query_plan import (
+    FilterPlanCache, build_conditions, decode_cursor, encode_cursor, keyset_condition, keyset_order,
+    last_by_filters_statement, multi_filters_statement,
+)
 from schemas.car_schema import CarCreate
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+logger = logging.getLogger(__name__)
+
 
 class CRUDBaseAsync(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
-    def __init__(self, model: Type[ModelType]):
+    def __init__(
+        self, model: Type[ModelType], cache: Optional[ReadThroughCache] = None, version: Optional[TableVersion] = None
+    ):
         """
         CRUD object with default methods to Create, Read, Update, Delete (CRUD).
 
@@ -28,11 +40,41 @@ class CRUDBaseAsync(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         * `model`: A SQLAlchemy model class
         * `schema`: A Pydantic model (schema) class
+        * `cache`: Optional read-through cache used by `get`
+        * `version`: Optional table version marker (kept up to date by database
+          triggers), used for conditional responses
         """
         self.model = model
+        self.cache = cache
+        self.version = version
+        self.filter_plans = FilterPlanCache(model)
+
+    def _cache_key(self, id: Any) -> str:
+        return f'{self.model.__name__}:{id}'
+
+    async def _invalidate(self, id: Any = None) -> None:
+        """
+        Remove `id` do cache, ou todos os registros do modelo quando `id` é None.
+        """
+        if self.cache is None:
+            return
+        if id is None:
+            await self.cache.delete_prefix(f'{self.model.__name__}:')
+        else:
+            await self.cache.delete(self._cache_key(id))
 
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
-        logging.info(f'Obtendo {self.model.__name__} de id={id}')
+        logger.info('Obtendo %s de id=%s', self.model.__name__, id)
+        if self.cache is not None:
+            data = await self.cache.get(self._cache_key(id))
+            if data is not None:
+                # Reanexa à sessão sem ir ao banco, como se tivesse sido carregado
+                db_obj = self.model(**data)
+                make_transient_to_detached(db_obj)
+                return await db.merge(db_obj, load=False)
+            # Antes da consulta: uma escrita concorrente invalida o token
+            token = self.cache.token(self._cache_key(id))
+
         stmt = select(self.model).where(
             self.model.id == id
             # Não vou filtrar aqui porque posso querer reativar os casos pelo ID
@@ -40,16 +82,51 @@ class CRUDBaseAsync(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             # self.model.exclude == False
         )
         result = await db.execute(stmt)
-        return result.scalars().first()
+        db_obj = result.scalars().first()
+        if db_obj is not None and self.cache is not None:
+            await self.cache.set(self._cache_key(id), {
+                c.key: getattr(db_obj, c.key) for c in self.model.__mapper__.column_attrs
+            }, token=token)
+        return db_obj
+
+    async def get_many(
+        self, db: AsyncSession, ids: List[Any], *, chunk_size: int = 1000
+    ) -> List[Optional[ModelType]]:
+        """
+        Busca vários registros por id com uma consulta `id = ANY(:ids)` por
+        lote de `chunk_size` ids. O resultado segue a ordem de `ids`, com None
+        para os ids que não existem.
+        """
+        logger.info('Obtendo %s %s por id', len(ids), self.model.__name__)
+        found: Dict[Any, ModelType] = {}
+        missing = list(dict.fromkeys(ids))
+        if self.cache is not None:
+            pending = []
+            for id in missing:
+                data = await self.cache.get(self._cache_key(id))
+                if data is None:
+                    pending.append(id)
+                    continue
+                db_obj = self.model(**data)
+                make_transient_to_detached(db_obj)
+                found[id] = await db.merge(db_obj, load=False)
+            missing = pending
+
+        ids_param = bindparam("ids", type_=ARRAY(self.model.__table__.c.id.type))
+        stmt = select(self.model).where(self.model.id == any_(ids_param))
+        for i in range(0, len(missing), chunk_size):
+            result = await db.execute(stmt, {"ids": missing[i:i + chunk_size]})
+            for db_obj in result.scalars().all():
+                found[db_obj.id] = db_obj
+        return [found.get(id) for id in ids]
 
     async def get_first_by_filter(
         self, db: AsyncSession, *, order_by: str = "id", filterby: str = "enviado", filter: str
     ) -> Optional[ModelType]:
-        logging.info(
-            f'Obtendo primeiro {self.model.__name__} cujo {filterby}={filter}')
+        logger.info('Obtendo primeiro %s cujo %s=%s', self.model.__name__, filterby, filter)
         stmt = (
             select(self.model)
-           
+            .where(getattr(self.model, filterby) == filter)
             .order_by(getattr(self.model, order_by))
         )
         result = await db.execute(stmt)
@@ -58,7 +135,7 @@ class CRUDBaseAsync(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     async def get_multi(
         self, db: AsyncSession, *, skip: int = 0, limit: int = 100, order_by: str = "id"
     ) -> List[ModelType]:
-        logging.info(f'Obtendo lista de {self.model.__name__}')
+        logger.info('Obtendo lista de %s', self.model.__name__)
         stmt = (
             select(self.model)
             .order_by(getattr(self.model, order_by))
@@ -68,11 +145,70 @@ class CRUDBaseAsync(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    async def get_multi_rows(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100, order_by: str = "id"
+    ) -> List[Dict[str, Any]]:
+        """
+        Igual a `get_multi`, mas seleciona só as colunas (Core) e devolve
+        dicionários, sem hidratar objetos do ORM. Pensado para listas que são
+        serializadas direto para JSON.
+        """
+        logger.info('Obtendo linhas de %s', self.model.__name__)
+        columns = self.model.__table__.columns
+        stmt = (
+            select(*columns)
+            .order_by(columns[order_by])
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await db.execute(stmt)
+        keys = list(result.keys())
+        return [dict(zip(keys, row)) for row in result.all()]
+
+    async def get_multi_cursor(
+        self,
+        db: AsyncSession,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        order_by: str = "id",
+        descending: bool = False,
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Paginação por cursor (keyset) ordenada por `order_by` + `id`.
+
+        Em vez de `OFFSET`, filtra a partir da última chave vista, então o custo
+        de qualquer página é o mesmo. Retorna os registros e o `next_cursor`
+        opaco da próxima página (None quando não há mais registros).
+        Linhas com `order_by` nulo vêm no fim (ou no início, se `descending`).
+        """
+        logger.info('Obtendo página de %s por cursor', self.model.__name__)
+        if order_by not in self.model.__table__.columns:
+            raise ValueError(f"Coluna desconhecida: {order_by}")
+
+        stmt = select(self.model)
+        if cursor:
+            cursor_order_by, cursor_descending, value, id = decode_cursor(cursor)
+            if cursor_order_by != order_by or cursor_descending != descending:
+                raise ValueError("Cursor não corresponde à ordenação solicitada")
+            stmt = stmt.where(keyset_condition(
+                self.model, order_by, value, id, descending, value_is_null=value is None))
+        stmt = stmt.order_by(*keyset_order(self.model, order_by, descending)).limit(limit + 1)
+
+        result = await db.execute(stmt)
+        objs = result.scalars().all()
+        next_cursor = None
+        if len(objs) > limit:
+            objs = objs[:limit]
+            last_obj = objs[-1]
+            next_cursor = encode_cursor(
+                order_by, descending, getattr(last_obj, order_by), last_obj.id)
+        return objs, next_cursor
+
     async def get_multi_filter(
         self, db: AsyncSession, *, order_by: str = "id", filterby: str = "enviado", filter: str
     ) -> List[ModelType]:
-        logging.info(
-            f'Obtendo lista de {self.model.__name__} cujo {filterby}={filter}')
+        logger.info('Obtendo lista de %s cujo %s=%s', self.model.__name__, filterby, filter)
         stmt = (
             select(self.model)
             .where(
@@ -88,76 +224,61 @@ class CRUDBaseAsync(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     async def get_multi_filters(
         self, db: AsyncSession, *, filters: List[Dict[str, Any]]
     ) -> List[ModelType]:
-        logging.info(
-            f'Obtendo lista de {self.model.__name__} de acordo com os filtros')
-        # Iniciando com a base: registros ativos e não excluídos.
-        stmt = select(self.model)
-        # Definir um mapa de operadores
-        operator_map = {
-            '=': lambda field, value: field == value,
-            '!=': lambda field, value: field != value,
-            '<': lambda field, value: field < value,
-            '<=': lambda field, value: field <= value,
-            '>': lambda field, value: field > value,
-            '>=': lambda field, value: field >= value,
-            'like': lambda field, value: field.like(value),
-            'ilike': lambda field, value: field.ilike(value),
-            'in': lambda field, value: field.in_(value),
-            'notin': lambda field, value: field.notin_(value),
-        }
-        for filter_item in filters:
-            field_name = filter_item["field"]
-            operator = filter_item.get("operator", "=")
-            value = filter_item["value"]
-            field = getattr(self.model, field_name)
-            if operator in operator_map:
-                stmt = stmt.filter(operator_map[operator](field, value))
-            else:
-                raise ValueError(f"Operador desconhecido: {operator}")
+        logger.info('Obtendo lista de %s de acordo com os filtros', self.model.__name__)
+        stmt = multi_filters_statement(self.model, filters)
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        filters: List[Dict[str, Any]],
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order_by: str = "id",
+        descending: bool = False,
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Busca paginada por cursor com filtros `{"field", "operator", "value"}`.
+
+        O statement é compilado uma vez por formato de filtro e reaproveitado
+        (ver `FilterPlanCache`); `limit` é obrigatório.
+        """
+        logger.info('Buscando %s com %s filtros', self.model.__name__, len(filters))
+        cursor_values = None
+        if cursor:
+            cursor_order_by, cursor_descending, value, id = decode_cursor(cursor)
+            if cursor_order_by != order_by or cursor_descending != descending:
+                raise ValueError("Cursor não corresponde à ordenação solicitada")
+            cursor_values = [id] if order_by == "id" else [value, id]
+
+        objs = await self.filter_plans.execute(
+            db, filters=filters, limit=limit + 1, order_by=order_by,
+            descending=descending, cursor_values=cursor_values)
+        next_cursor = None
+        if len(objs) > limit:
+            objs = objs[:limit]
+            last_obj = objs[-1]
+            next_cursor = encode_cursor(
+                order_by, descending, getattr(last_obj, order_by), last_obj.id)
+        return objs, next_cursor
+
     async def get_last_by_filters(
         self,
         db: AsyncSession,
         *,
         filters: Dict[str, Dict[str, Union[str, int]]],
     ) -> Optional[ModelType]:
-        logging.info(
-            f'Obtendo último registro de {self.model.__name__} de acordo com os filtros')
+        logger.info('Obtendo último registro de %s de acordo com os filtros', self.model.__name__)
 
-        stmt = select(self.model)
-
-        for filter_name, filter_data in filters.items():
-            operator = filter_data['operator']
-            filter_value = filter_data['value']
-
-            column = getattr(self.model, filter_name)
-
-            if operator == '>':
-                stmt = stmt.where(column > filter_value)
-            elif operator == '<':
-                stmt = stmt.where(column < filter_value)
-            elif operator == '>=':
-                stmt = stmt.where(column >= filter_value)
-            elif operator == '<=':
-                stmt = stmt.where(column <= filter_value)
-            elif operator == '==':
-                stmt = stmt.where(column == filter_value)
-            elif operator == '!=':
-                stmt = stmt.where(column != filter_value)
-            elif operator == 'like':
-                stmt = stmt.where(column.like(f"%{filter_value}%"))
-            elif operator == 'is_null':
-                stmt = stmt.where(column.is_(None))
-
-        stmt = stmt.order_by(desc(self.model.id)).limit(1)
+        stmt = last_by_filters_statement(self.model, filters)
 
         result = await db.execute(stmt)
         return result.scalars().first()
 
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
-        logging.info(f'Criando objeto em {self.model.__name__}')
+        logger.info('Criando objeto em %s', self.model.__name__)
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)  # type: ignore
         db.add(db_obj)
@@ -174,18 +295,57 @@ class CRUDBaseAsync(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return {'msg': 'Chamados inseridos com sucesso'}
 
     async def create_multi(self, db: AsyncSession, *, obj_in: List[CreateSchemaType]) -> dict:
-        logging.info(f'Criando lista de objetos {self.model.__name__}')
+        logger.info('Criando lista de objetos %s', self.model.__name__)
         db_objs = [self.model(**jsonable_encoder(item)) for item in obj_in]
         db.add_all(db_objs)
         await db.commit()
-        for obj in db_objs:
-            db.refresh(obj)
         return {'msg': 'Chamados inseridos com sucesso'}
 
+    async def create_multi_fast(
+        self, db: AsyncSession, *, obj_in: List[CreateSchemaType], returning: bool = False, chunk_size: int = 5000
+    ) -> dict:
+        """
+        Inserção em massa sem passar pelo ORM.
+
+        * `returning=False`: usa `COPY` binário do Postgres via asyncpg; mais
+          rápido, mas não retorna os ids gerados.
+        * `returning=True`: usa `INSERT ... VALUES (...), (...) RETURNING id`
+          em lotes de `chunk_size` linhas.
+
+        Tudo roda numa única transação.
+        """
+        logger.info('Criando lista de objetos %s em massa (%s)',
+                    self.model.__name__, "returning" if returning else "copy")
+        rows = [item.dict() for item in obj_in]
+        if not rows:
+            return {'msg': 'Chamados inseridos com sucesso', 'count': 0}
+
+        if returning:
+            ids = []
+            for i in range(0, len(rows), chunk_size):
+                stmt = insert(self.model).values(rows[i:i + chunk_size]).returning(self.model.id)
+                result = await db.execute(stmt)
+                ids.extend(result.scalars().all())
+            await db.commit()
+            return {'msg': 'Chamados inseridos com sucesso', 'count': len(ids), 'ids': ids}
+
+        columns = list(rows[0].keys())
+        records = [tuple(row[c] for c in columns) for row in rows]
+        conn = await db.connection()
+        raw_conn = await conn.get_raw_connection()
+        await raw_conn.driver_connection.copy_records_to_table(
+            self.model.__table__.name,
+            records=records,
+            columns=columns,
+            schema_name=self.model.__table__.schema,
+        )
+        await db.commit()
+        return {'msg': 'Chamados inseridos com sucesso', 'count': len(records)}
+
     async def update(
         self, db: AsyncSession, *, db_obj: ModelType, obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
-        logging.info(f'Atualizando o objeto de {self.model.__name__}')
+        logger.info('Atualizando o objeto de %s', self.model.__name__)
         obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
@@ -196,13 +356,37 @@ class CRUDBaseAsync(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 setattr(db_obj, field, update_data[field])
         db.add(db_obj)
         await db.commit()
+        await self._invalidate(db_obj.id)
         await db.refresh(db_obj)
         return db_obj
 
+    async def update_returning(
+        self, db: AsyncSession, *, id: Any, obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> Optional[ModelType]:
+        """
+        Atualiza por id com um único `UPDATE ... RETURNING`, sem carregar o
+        objeto antes. Retorna uma instância desanexada com os valores gravados,
+        ou None se o id não existe.
+        """
+        logger.info('Atualizando %s de id=%s (returning)', self.model.__name__, id)
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+        table = self.model.__table__
+        update_data = {k: v for k, v in update_data.items() if k in table.columns and k != "id"}
+        if not update_data:
+            return await self.get(db=db, id=id)
+
+        stmt = update(table).where(table.c.id == id).values(**update_data).returning(*table.columns)
+        row = (await db.execute(stmt)).first()
+        await db.commit()
+        if row is None:
+            return None
+        await self._invalidate(id)
+        return self.model(**row._mapping)
+
     async def update_multi(
         self, db: AsyncSession, *, objs_in: List[Union[UpdateSchemaType, Dict[str, Any]]], filtro: str
     ) -> List[ModelType]:
-        logging.info(f'Atualizando lista de objetos {self.model.__name__}')
+        logger.info('Atualizando lista de objetos %s', self.model.__name__)
         updated_objs = []
         for obj_in in objs_in:
             obj_data = jsonable_encoder(obj_in) if isinstance(
@@ -226,10 +410,84 @@ class CRUDBaseAsync(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                     .values(**obj_data)
                 )
                 await db.commit()
+                await self._invalidate(db_obj.id)
                 await db.refresh(db_obj)
                 updated_objs.append(db_obj)
         return updated_objs
 
+    async def update_bulk(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: List[Union[UpdateSchemaType, Dict[str, Any]]],
+        key: str = "id",
+        max_params: int = 30000,
+    ) -> dict:
+        """
+        Atualiza vários registros com `UPDATE ... FROM (VALUES ...) RETURNING`,
+        numa única transação: uma instrução por conjunto de colunas alteradas
+        (divididas apenas para respeitar o limite de parâmetros do Postgres).
+
+        Retorna as chaves encontradas (`matched`) e não encontradas (`unmatched`).
+        Itens sem campos além da chave, ou com null em coluna NOT NULL, geram
+        `ValueError` antes de qualquer escrita.
+        """
+        logger.info('Atualizando em massa %s objetos %s', len(objs_in), self.model.__name__)
+        table = self.model.__table__
+        if key not in table.columns:
+            raise ValueError(f"Coluna desconhecida: {key}")
+
+        # Uma linha por chave em cada grupo: a última ocorrência prevalece
+        groups: Dict[Tuple[str, ...], Dict[Any, Dict[str, Any]]] = {}
+        for obj_in in objs_in:
+            obj_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+            if key not in obj_data:
+                raise ValueError(f"Item sem a chave {key}")
+            fields = tuple(sorted(f for f in obj_data if f != key))
+            if not fields:
+                # Sem campos não há UPDATE, e a chave sairia como `unmatched`
+                # mesmo existindo
+                raise ValueError(f"Item sem campos para atualizar: {key}={obj_data[key]}")
+            for field in fields:
+                if field not in table.columns:
+                    raise ValueError(f"Coluna desconhecida: {field}")
+                if obj_data[field] is None and not table.c[field].nullable:
+                    raise ValueError(f"Coluna {field} não aceita null: {key}={obj_data[key]}")
+            groups.setdefault(fields, {})[obj_data[key]] = obj_data
+
+        matched = set()
+        for fields, rows_by_key in groups.items():
+            rows = list(rows_by_key.values())
+            names = (key, *fields)
+            chunk_size = max(1, max_params // len(names))
+            for i in range(0, len(rows), chunk_size):
+                data = values(
+                    *[column(name, table.c[name].type) for name in names], name="v"
+                ).data([tuple(row[name] for name in names) for row in rows[i:i + chunk_size]])
+                stmt = (
+                    update(table)
+                    .where(table.c[key] == data.c[key])
+                    .values({name: data.c[name] for name in fields})
+                    .returning(table.c[key])
+                )
+                result = await db.execute(stmt)
+                matched.update(result.scalars().all())
+        await db.commit()
+
+        if key == "id":
+            for id in matched:
+                await self._invalidate(id)
+        else:
+            await self._invalidate()
+
+        keys = list(dict.fromkeys(
+            (obj_in if isinstance(obj_in, dict) else obj_in.dict())[key] for obj_in in objs_in))
+        return {
+            "matched": [k for k in keys if k in matched],
+            "unmatched": [k for k in keys if k not in matched],
+            "updated": len(matched),
+        }
+
     async def update_many(
         self, db: AsyncSession, *, filter_args: Dict[str, Any], update_data: Dict[str, Any]
     ) -> int:
@@ -237,22 +495,153 @@ class CRUDBaseAsync(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Atualiza em massa os registros do modelo que atendem aos filtros especificados.
         Retorna o número de registros atualizados.
         """
-        logging.info(
-            f'Atualizando vários objetos de {self.model.__name__} com filtro {filter_args}')
+        logger.info('Atualizando vários objetos de %s com filtro %s', self.model.__name__, filter_args)
         stmt = update(self.model).filter_by(
             **filter_args).values(**update_data)
         result = await db.execute(stmt)
         await db.commit()
+        await self._invalidate()
         return result.rowcount
 
     async def remove(self, db: AsyncSession, *, id: int) -> Optional[ModelType]:
-        logging.info(f'Removendo objeto {self.model.__name__} de id={id}')
+        logger.info('Removendo objeto %s de id=%s', self.model.__name__, id)
         db_obj = await self.get(db=db, id=id)
         if db_obj:
             await db.delete(db_obj)
             await db.commit()
+            await self._invalidate(id)
         return db_obj
     
+    async def remove_returning(self, db: AsyncSession, *, id: int) -> Optional[ModelType]:
+        """
+        Remove por id com um único `DELETE ... RETURNING`. Retorna uma instância
+        desanexada com os valores removidos, ou None se o id não existe.
+        """
+        logger.info('Removendo objeto %s de id=%s (returning)', self.model.__name__, id)
+        table = self.model.__table__
+        stmt = delete(table).where(table.c.id == id).returning(*table.columns)
+        row = (await db.execute(stmt)).first()
+        await db.commit()
+        if row is None:
+            return None
+        await self._invalidate(id)
+        return self.model(**row._mapping)
+
+    def validate_remove_many(
+        self, *, ids: Optional[List[Any]] = None, filters: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Valida os argumentos de `iter_remove_many` sem tocar no banco (levanta
+        ValueError), para checar antes de iniciar uma resposta em streaming.
+        """
+        if (ids is None) == (filters is None):
+            raise ValueError("Informe ids ou filtros")
+        if filters is not None:
+            if not filters:
+                raise ValueError("Informe ao menos um filtro")
+            build_conditions(self.model, filters)
+
+    async def iter_remove_many(
+        self,
+        db: AsyncSession,
+        *,
+        ids: Optional[List[Any]] = None,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        batch_size: int = 5000,
+    ) -> AsyncIterator[int]:
+        """
+        Remove registros por lista de ids ou por filtros em lotes de até
+        `batch_size` linhas, com um `DELETE` e um commit por lote para não
+        segurar locks por muito tempo. Entrega o total removido após cada lote.
+        """
+        self.validate_remove_many(ids=ids, filters=filters)
+        logger.info('Removendo %s em lotes de %s', self.model.__name__, batch_size)
+        table = self.model.__table__
+        ids_type = ARRAY(table.c.id.type)
+
+        if ids is not None:
+            unique_ids = list(dict.fromkeys(ids))
+            batches = (
+                delete(table)
+                .where(table.c.id == any_(bindparam("ids", unique_ids[i:i + batch_size], type_=ids_type)))
+                .returning(table.c.id)
+                for i in range(0, len(unique_ids), batch_size)
+            )
+        else:
+            subquery = (
+                select(table.c.id)
+                .where(*build_conditions(self.model, filters))
+                .order_by(table.c.id)
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            stmt = delete(table).where(table.c.id.in_(subquery)).returning(table.c.id)
+
+            def _repeat():
+                while True:
+                    yield stmt
+            batches = _repeat()
+
+        deleted = 0
+        for stmt in batches:
+            removed_ids = (await db.execute(stmt)).scalars().all()
+            await db.commit()
+            if removed_ids:
+                deleted += len(removed_ids)
+                for id in removed_ids:
+                    await self._invalidate(id)
+                yield deleted
+            elif filters is not None:
+                break
+
+    async def remove_many(
+        self,
+        db: AsyncSession,
+        *,
+        ids: Optional[List[Any]] = None,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        batch_size: int = 5000,
+    ) -> int:
+        """
+        Como `iter_remove_many`, retornando apenas o total removido.
+        """
+        deleted = 0
+        async for deleted in self.iter_remove_many(db, ids=ids, filters=filters, batch_size=batch_size):
+            pass
+        return deleted
+
     async def get_all(self, db: AsyncSession):
         result = await db.execute(select(self.model))
         return result.scalars().all()
+
+    async def stream_rows(
+        self,
+        db: AsyncSession,
+        *,
+        chunk_size: int = 1000,
+        order_by: str = "id",
+        after_id: Optional[Any] = None,
+        filters: Optional[List[Dict[str, Any]]] = None,
+    ) -> AsyncIterator[Sequence[Tuple[Any, ...]]]:
+        """
+        Percorre a tabela com um cursor do lado do servidor, entregando lotes de
+        `chunk_size` tuplas (na ordem de `self.model.__table__.columns`) sem
+        hidratar objetos do ORM.
+
+        `filters` segue o formato de `search`; `after_id` retoma a leitura após
+        esse id (exige `order_by="id"`).
+        """
+        logger.info('Transmitindo %s em lotes de %s', self.model.__name__, chunk_size)
+        if after_id is not None and order_by != "id":
+            raise ValueError("after_id exige ordenação por id")
+        stmt = (
+            select(*self.model.__table__.columns)
+            .where(*build_conditions(self.model, filters or []))
+            .order_by(getattr(self.model, order_by))
+            .execution_options(yield_per=chunk_size)
+        )
+        if after_id is not None:
+            stmt = stmt.where(self.model.id > after_id)
+        result = await db.stream(stmt)
+        async for partition in result.partitions(chunk_size):
+            yield [tuple(row) for row in partition]
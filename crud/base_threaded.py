@@ -0,0 +1,223 @@
+import logging
+from typing import Any, Callable, Dict, Generic, List, Optional, Type, TypeVar, Union
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from core.db_executor import DBThreadExecutor
+from crud.query_plan import last_by_filters_statement, multi_filters_statement
+from db.base_class import Base
+
+ModelType = TypeVar("ModelType", bound=Base)
+CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
+UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
+
+logger = logging.getLogger(__name__)
+
+
+class CRUDBaseThreaded(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    def __init__(self, model: Type[ModelType], session_factory: Callable[[], Session], executor: DBThreadExecutor):
+        """
+        Async facade over a synchronous database (SQL Server 211/212) with the
+        generic CRUD and filter methods of `CRUDBaseAsync` and the same
+        arguments, minus `db` (the session is opened here): `get`,
+        `get_first_by_filter`, `get_multi`, `get_multi_filter`,
+        `get_multi_filters`, `get_last_by_filters`, `get_all`, `create`,
+        `create_multi`, `update`, `update_multi`, `update_many` and `remove`.
+        `update_by_id` is an extra that loads the object inside the thread.
+        The Postgres-specific methods (cache, cursors, search, bulk/COPY
+        writes, streaming) are not provided.
+
+        Every call opens its own `Session` inside a thread of `executor`, so
+        the session never crosses threads and slow queries stay confined to
+        that database's pool. Returned objects are detached from the session.
+
+        **Parameters**
+
+        * `model`: A SQLAlchemy model class
+        * `session_factory`: Sync sessionmaker (e.g. `SessionLocal_211`)
+        * `executor`: The database's dedicated thread executor
+        """
+        self.model = model
+        self.session_factory = session_factory
+        self.executor = executor
+
+    def _in_session(self, fn: Callable[[Session], Any]) -> Any:
+        with self.session_factory() as db:
+            db.expire_on_commit = False
+            return fn(db)
+
+    async def _run(self, fn: Callable[[Session], Any]) -> Any:
+        return await self.executor.run(self._in_session, fn)
+
+    async def get(self, id: Any) -> Optional[ModelType]:
+        logger.info('Obtendo %s de id=%s (%s)', self.model.__name__, id, self.executor.name)
+        return await self._run(
+            lambda db: db.execute(select(self.model).where(self.model.id == id)).scalars().first())
+
+    async def get_first_by_filter(
+        self, *, order_by: str = "id", filterby: str = "enviado", filter: str
+    ) -> Optional[ModelType]:
+        logger.info('Obtendo primeiro %s cujo %s=%s (%s)', self.model.__name__, filterby, filter, self.executor.name)
+        stmt = (
+            select(self.model)
+            .where(getattr(self.model, filterby) == filter)
+            .order_by(getattr(self.model, order_by))
+        )
+        return await self._run(lambda db: db.execute(stmt).scalars().first())
+
+    async def get_multi(self, *, skip: int = 0, limit: int = 100, order_by: str = "id") -> List[ModelType]:
+        logger.info('Obtendo lista de %s (%s)', self.model.__name__, self.executor.name)
+        stmt = (
+            select(self.model)
+            .order_by(getattr(self.model, order_by))
+            .offset(skip)
+            .limit(limit)
+        )
+        return await self._run(lambda db: db.execute(stmt).scalars().all())
+
+    async def get_multi_filter(
+        self, *, order_by: str = "id", filterby: str = "enviado", filter: str
+    ) -> List[ModelType]:
+        logger.info('Obtendo lista de %s cujo %s=%s (%s)', self.model.__name__, filterby, filter, self.executor.name)
+        stmt = (
+            select(self.model)
+            .where(
+                getattr(self.model, filterby) == filter,
+                self.model.ativo == True,
+            )
+            .order_by(getattr(self.model, order_by))
+        )
+        return await self._run(lambda db: db.execute(stmt).scalars().all())
+
+    async def get_multi_filters(self, *, filters: List[Dict[str, Any]]) -> List[ModelType]:
+        logger.info('Obtendo lista de %s de acordo com os filtros (%s)', self.model.__name__, self.executor.name)
+        stmt = multi_filters_statement(self.model, filters)
+        return await self._run(lambda db: db.execute(stmt).scalars().all())
+
+    async def get_last_by_filters(
+        self, *, filters: Dict[str, Dict[str, Union[str, int]]]
+    ) -> Optional[ModelType]:
+        logger.info('Obtendo último registro de %s (%s)', self.model.__name__, self.executor.name)
+        stmt = last_by_filters_statement(self.model, filters)
+        return await self._run(lambda db: db.execute(stmt).scalars().first())
+
+    async def get_all(self) -> List[ModelType]:
+        return await self._run(lambda db: db.execute(select(self.model)).scalars().all())
+
+    async def create(self, *, obj_in: CreateSchemaType) -> ModelType:
+        logger.info('Criando objeto em %s (%s)', self.model.__name__, self.executor.name)
+
+        def _create(db: Session) -> ModelType:
+            db_obj = self.model(**jsonable_encoder(obj_in))
+            db.add(db_obj)
+            db.commit()
+            db.refresh(db_obj)
+            return db_obj
+
+        return await self._run(_create)
+
+    async def create_multi(self, *, obj_in: List[CreateSchemaType]) -> dict:
+        logger.info('Criando lista de objetos %s (%s)', self.model.__name__, self.executor.name)
+
+        def _create_multi(db: Session) -> None:
+            db.bulk_save_objects([self.model(**jsonable_encoder(item)) for item in obj_in])
+            db.commit()
+
+        await self._run(_create_multi)
+        return {'msg': 'Chamados inseridos com sucesso'}
+
+    async def update(
+        self, *, db_obj: ModelType, obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        logger.info('Atualizando o objeto de %s (%s)', self.model.__name__, self.executor.name)
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+
+        def _update(db: Session) -> ModelType:
+            # `db_obj` veio de outra sessão (destacado): `merge` o reanexa nesta
+            merged = db.merge(db_obj)
+            for field, value in update_data.items():
+                if hasattr(merged, field):
+                    setattr(merged, field, value)
+            db.commit()
+            db.refresh(merged)
+            return merged
+
+        return await self._run(_update)
+
+    async def update_by_id(
+        self, *, id: Any, obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> Optional[ModelType]:
+        """
+        Como `update`, mas carrega o objeto pelo id na própria thread
+        (uma ida ao banco a menos). Retorna `None` se o id não existir.
+        """
+        logger.info('Atualizando o objeto de %s (%s)', self.model.__name__, self.executor.name)
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+
+        def _update(db: Session) -> Optional[ModelType]:
+            db_obj = db.get(self.model, id)
+            if db_obj is None:
+                return None
+            for field, value in update_data.items():
+                if hasattr(db_obj, field):
+                    setattr(db_obj, field, value)
+            db.commit()
+            db.refresh(db_obj)
+            return db_obj
+
+        return await self._run(_update)
+
+    async def update_multi(
+        self, *, objs_in: List[Union[UpdateSchemaType, Dict[str, Any]]], filtro: str
+    ) -> List[ModelType]:
+        logger.info('Atualizando lista de objetos %s (%s)', self.model.__name__, self.executor.name)
+        objs_data = [jsonable_encoder(obj_in) if isinstance(obj_in, BaseModel) else obj_in for obj_in in objs_in]
+
+        def _update_multi(db: Session) -> List[ModelType]:
+            updated_objs = []
+            for obj_data in objs_data:
+                filter_args = {filtro: obj_data[filtro]}
+                db_obj = db.execute(
+                    select(self.model).filter_by(**filter_args).filter(self.model.ativo == True)
+                ).scalars().first()
+                if db_obj:
+                    db.execute(
+                        update(self.model)
+                        .filter_by(**filter_args)
+                        .filter(
+                            self.model.ativo == True,
+                            self.model.exclude == False
+                        )
+                        .values(**obj_data)
+                    )
+                    db.commit()
+                    db.refresh(db_obj)
+                    updated_objs.append(db_obj)
+            return updated_objs
+
+        return await self._run(_update_multi)
+
+    async def update_many(self, *, filter_args: Dict[str, Any], update_data: Dict[str, Any]) -> int:
+        logger.info('Atualizando vários objetos de %s (%s)', self.model.__name__, self.executor.name)
+
+        def _update_many(db: Session) -> int:
+            result = db.execute(update(self.model).filter_by(**filter_args).values(**update_data))
+            db.commit()
+            return result.rowcount
+
+        return await self._run(_update_many)
+
+    async def remove(self, *, id: int) -> Optional[ModelType]:
+        logger.info('Removendo objeto %s de id=%s (%s)', self.model.__name__, id, self.executor.name)
+
+        def _remove(db: Session) -> Optional[ModelType]:
+            db_obj = db.get(self.model, id)
+            if db_obj is not None:
+                db.delete(db_obj)
+                db.commit()
+            return db_obj
+
+        return await self._run(_remove)
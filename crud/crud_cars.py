@@ -1,10 +1,45 @@
+from typing import List, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from core.cache import ReadThroughCache
+from core.table_version import TableVersion
 from crud.base import CRUDBaseAsync
-from models.car_model import Car
+from models.car_model import Car, car_search_document
 from schemas.car_schema import  CarCreate, CarUpdate
 
 
 class CRUDItem(CRUDBaseAsync[ Car, CarCreate, CarUpdate]):
-    pass
+
+    async def text_search(self, db: AsyncSession, *, q: str, limit: int = 20) -> List[Tuple[Car, float]]:
+        """
+        Busca textual em modelo/nome/marca/versao usando o índice trigram
+        `ix_Carrinhos_search_trgm`. Aceita trechos de palavras e pequenos erros
+        de digitação; os resultados vêm ordenados por similaridade.
+        """
+        q = q.strip()
+        pattern = '%' + q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        rank = func.word_similarity(q, car_search_document).label('rank')
+        stmt = (
+            select(Car, rank)
+            .where(or_(
+                car_search_document.ilike(pattern),
+                car_search_document.op('%>')(q),
+            ))
+            .order_by(rank.desc(), Car.id)
+            .limit(limit)
+        )
+        result = await db.execute(stmt)
+        return [(car, round(float(rank), 4)) for car, rank in result.all()]
 
 
-crud_car = CRUDItem(Car)
+# Cache só do processo: com vários workers, uma escrita feita em outro worker
+# pode levar até `ttl` segundos para aparecer em get/get_many. Passe
+# `shared=` (e, se quiser, um `local_ttl` curto) para reduzir esse limite.
+crud_car = CRUDItem(
+    Car,
+    cache=ReadThroughCache(maxsize=10000, ttl=60),
+    version=TableVersion(Car.__tablename__),
+)
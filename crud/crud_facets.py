@@ -0,0 +1,75 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from core.table_version import TableVersion
+from models.car_model import Car, CarFacetCount
+
+logger = logging.getLogger(__name__)
+
+FACETS = ("marca", "ano", "cor")
+
+
+class CRUDCarFacets:
+    """
+    Leitura das facetas de carros a partir da tabela de resumo
+    `Carrinhos_facets`, sem varrer a tabela de carros.
+    """
+
+    def __init__(self, version: TableVersion):
+        self.version = version
+
+    async def get_facets(
+        self,
+        db: AsyncSession,
+        *,
+        facets: Sequence[str] = FACETS,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Contagem por valor de cada faceta em `facets`, considerando apenas os
+        carros que atendem a `filters` (igualdade em marca/ano/cor).
+        """
+        filters = {k: v for k, v in (filters or {}).items() if v is not None}
+        for name in (*facets, *filters):
+            if name not in FACETS:
+                raise ValueError(f"Faceta desconhecida: {name}")
+        logger.info('Obtendo facetas %s com filtros %s', list(facets), filters)
+
+        conditions = [getattr(CarFacetCount, k) == v for k, v in filters.items()]
+        result = {}
+        for name in facets:
+            column = getattr(CarFacetCount, name)
+            stmt = (
+                select(column, func.sum(CarFacetCount.total).label("count"))
+                .where(*conditions)
+                .group_by(column)
+                .order_by(func.sum(CarFacetCount.total).desc(), column)
+            )
+            rows = (await db.execute(stmt)).all()
+            result[name] = [{"value": value, "count": int(count)} for value, count in rows]
+        return result
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """
+        Recalcula o resumo inteiro a partir de Carrinhos (correção de desvios).
+        Os triggers de Carrinhos não disparam aqui, então a versão da tabela é
+        incrementada na mesma transação para invalidar as respostas de /facets.
+        """
+        logger.info('Recalculando a tabela de facetas')
+        await db.execute(delete(CarFacetCount))
+        result = await db.execute(
+            insert(CarFacetCount).from_select(
+                ["marca", "ano", "cor", "total"],
+                select(Car.marca, Car.ano, Car.cor, func.count()).group_by(Car.marca, Car.ano, Car.cor),
+            )
+        )
+        await self.version.bump(db)
+        await db.commit()
+        return result.rowcount
+
+
+crud_car_facets = CRUDCarFacets(TableVersion(Car.__tablename__))
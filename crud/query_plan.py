@@ -0,0 +1,292 @@
+import base64
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import all_, and_, any_, bindparam, desc, or_, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+# Operadores aceitos e se recebem valor. `in`/`notin` usam um único parâmetro
+# array (= ANY / != ALL), então o formato não muda com o tamanho da lista.
+OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    '=': lambda field, param: field == param,
+    '!=': lambda field, param: field != param,
+    '<': lambda field, param: field < param,
+    '<=': lambda field, param: field <= param,
+    '>': lambda field, param: field > param,
+    '>=': lambda field, param: field >= param,
+    'like': lambda field, param: field.like(param),
+    'ilike': lambda field, param: field.ilike(param),
+    'in': lambda field, param: field == any_(param),
+    'notin': lambda field, param: field != all_(param),
+    'is_null': lambda field, param: field.is_(None),
+    'not_null': lambda field, param: field.is_not(None),
+}
+_ARRAY_OPERATORS = {'in', 'notin'}
+_VALUELESS_OPERATORS = {'is_null', 'not_null'}
+
+
+def _column(model, name: str):
+    if name not in model.__table__.columns:
+        raise ValueError(f"Coluna desconhecida: {name}")
+    return getattr(model, name)
+
+
+def _condition(model, field_name: str, operator: str, name: str, **kw):
+    if operator not in OPERATORS:
+        raise ValueError(f"Operador desconhecido: {operator}")
+    column = _column(model, field_name)
+    param_type = ARRAY(column.type) if operator in _ARRAY_OPERATORS else column.type
+    return OPERATORS[operator](column, bindparam(name, type_=param_type, **kw))
+
+
+def _param_value(filter_item: Dict[str, Any]) -> Any:
+    operator = filter_item.get('operator', '=')
+    value = filter_item.get('value')
+    if operator in _ARRAY_OPERATORS:
+        if not isinstance(value, (list, tuple)):
+            raise ValueError(f"O operador {operator} espera uma lista")
+        return list(value)
+    return value
+
+
+def build_conditions(model, filters: Sequence[Dict[str, Any]]) -> List[Any]:
+    """
+    Converte filtros `{"field", "operator", "value"}` em condições com os
+    valores já vinculados, para uso avulso (fora do cache de planos).
+    """
+    return [
+        _condition(model, f['field'], f.get('operator', '='), f'p{i}', value=_param_value(f))
+        for i, f in enumerate(filters)
+    ]
+
+
+def multi_filters_statement(model, filters: Sequence[Dict[str, Any]]):
+    """
+    Statement de `get_multi_filters`: filtros `{"field", "operator", "value"}`
+    com os valores embutidos, sem limite. Compartilhado pelos CRUDs
+    assíncrono e com threads.
+    """
+    stmt = select(model)
+    # Definir um mapa de operadores
+    operator_map = {
+        '=': lambda field, value: field == value,
+        '!=': lambda field, value: field != value,
+        '<': lambda field, value: field < value,
+        '<=': lambda field, value: field <= value,
+        '>': lambda field, value: field > value,
+        '>=': lambda field, value: field >= value,
+        'like': lambda field, value: field.like(value),
+        'ilike': lambda field, value: field.ilike(value),
+        'in': lambda field, value: field.in_(value),
+        'notin': lambda field, value: field.notin_(value),
+    }
+    for filter_item in filters:
+        field_name = filter_item["field"]
+        operator = filter_item.get("operator", "=")
+        value = filter_item["value"]
+        field = getattr(model, field_name)
+        if operator in operator_map:
+            stmt = stmt.filter(operator_map[operator](field, value))
+        else:
+            raise ValueError(f"Operador desconhecido: {operator}")
+    return stmt
+
+
+def last_by_filters_statement(model, filters: Dict[str, Dict[str, Any]]):
+    """
+    Statement de `get_last_by_filters`: filtros no formato
+    `{campo: {"operator", "value"}}` e o registro de maior id.
+    Compartilhado pelos CRUDs assíncrono e com threads.
+    """
+    stmt = select(model)
+
+    for filter_name, filter_data in filters.items():
+        operator = filter_data['operator']
+        filter_value = filter_data['value']
+
+        column = getattr(model, filter_name)
+
+        if operator == '>':
+            stmt = stmt.where(column > filter_value)
+        elif operator == '<':
+            stmt = stmt.where(column < filter_value)
+        elif operator == '>=':
+            stmt = stmt.where(column >= filter_value)
+        elif operator == '<=':
+            stmt = stmt.where(column <= filter_value)
+        elif operator == '==':
+            stmt = stmt.where(column == filter_value)
+        elif operator == '!=':
+            stmt = stmt.where(column != filter_value)
+        elif operator == 'like':
+            stmt = stmt.where(column.like(f"%{filter_value}%"))
+        elif operator == 'is_null':
+            stmt = stmt.where(column.is_(None))
+
+    return stmt.order_by(desc(model.id)).limit(1)
+
+
+def encode_cursor(order_by: str, descending: bool, value: Any, id: Any) -> str:
+    payload = json.dumps([order_by, descending, value, id], default=str)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, bool, Any, Any]:
+    try:
+        order_by, descending, value, id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError(f"Cursor inválido: {cursor}")
+    return order_by, descending, value, id
+
+
+def keyset_order(model, order_by: str, descending: bool) -> List[Any]:
+    """
+    Chaves de ordenação da paginação por cursor: `order_by` + `id`, com os
+    NULLs explicitamente no fim (asc) ou no início (desc), que é a ordem
+    inversa exata e a mesma assumida por `keyset_condition`.
+    """
+    if order_by == 'id':
+        return [desc(model.id) if descending else model.id]
+    column = _column(model, order_by)
+    if descending:
+        return [column.desc().nulls_first(), model.id.desc()]
+    return [column.asc().nulls_last(), model.id.asc()]
+
+
+def keyset_condition(model, order_by: str, value: Any, id: Any, descending: bool, value_is_null: bool = False):
+    """
+    Condição "depois do cursor" para `keyset_order`. `value`/`id` podem ser
+    valores ou bindparams; `value_is_null` indica um cursor parado numa linha
+    com `order_by` nulo.
+
+    Em colunas NOT NULL usa a comparação de tupla (aproveita o índice). Em
+    colunas anuláveis a tupla daria NULL nas linhas com a coluna nula, que
+    seriam puladas, então a condição é expandida.
+    """
+    after = (lambda a, b: a < b) if descending else (lambda a, b: a > b)
+    if order_by == 'id':
+        return after(model.id, id)
+    column = _column(model, order_by)
+    if not model.__table__.columns[order_by].nullable:
+        return after(tuple_(column, model.id), tuple_(value, id))
+    if value_is_null:
+        # asc: NULLs no fim, só restam NULLs com id maior;
+        # desc: NULLs no início, restam os NULLs com id menor e todos os não nulos
+        same_null = and_(column.is_(None), after(model.id, id))
+        return or_(same_null, column.is_not(None)) if descending else same_null
+    condition = or_(after(column, value), and_(column == value, after(model.id, id)))
+    return condition if descending else or_(condition, column.is_(None))
+
+
+# (campos e operadores, coluna de ordenação, descendente, tipo de cursor).
+# O tipo de cursor é None (primeira página), 'value' ou 'null' (cursor parado
+# numa linha com a coluna de ordenação nula), pois a condição muda de forma.
+Shape = Tuple[Tuple[Tuple[str, str], ...], str, bool, Optional[str]]
+
+
+class FilterPlanCache:
+    """
+    Compila especificações de filtro em statements parametrizados e guarda um
+    statement por formato de filtro (campos + operadores + ordenação), de modo
+    que formatos repetidos reaproveitam o mesmo objeto e o cache de compilação
+    do SQLAlchemy. Também mede a latência por formato.
+    """
+
+    def __init__(self, model, maxsize: int = 256):
+        self.model = model
+        self.maxsize = maxsize
+        self._plans: "OrderedDict[Shape, Any]" = OrderedDict()
+        self._stats: Dict[Shape, Dict[str, float]] = {}
+
+    def _compile(self, shape: Shape):
+        conditions, order_by, descending, cursor = shape
+        stmt = select(self.model)
+        for i, (field_name, operator) in enumerate(conditions):
+            stmt = stmt.where(_condition(self.model, field_name, operator, f'p{i}'))
+
+        order_column = _column(self.model, order_by)
+        if cursor is not None:
+            if order_by == 'id':
+                value, id = None, bindparam('cursor_0', type_=self.model.id.type)
+            else:
+                value = bindparam('cursor_0', type_=order_column.type) if cursor == 'value' else None
+                id = bindparam('cursor_1', type_=self.model.id.type)
+            stmt = stmt.where(keyset_condition(
+                self.model, order_by, value, id, descending, value_is_null=cursor == 'null'))
+        return (
+            stmt.order_by(*keyset_order(self.model, order_by, descending))
+            .limit(bindparam('limit'))
+        )
+
+    def plan(self, shape: Shape):
+        stmt = self._plans.get(shape)
+        if stmt is None:
+            stmt = self._compile(shape)
+            self._plans[shape] = stmt
+            if len(self._plans) > self.maxsize:
+                evicted, _ = self._plans.popitem(last=False)
+                self._stats.pop(evicted, None)
+        else:
+            self._plans.move_to_end(shape)
+        return stmt
+
+    async def execute(
+        self,
+        db: AsyncSession,
+        *,
+        filters: Sequence[Dict[str, Any]],
+        limit: int,
+        order_by: str = 'id',
+        descending: bool = False,
+        cursor_values: Optional[Sequence[Any]] = None,
+    ) -> List[Any]:
+        conditions = []
+        params: Dict[str, Any] = {'limit': limit}
+        for i, filter_item in enumerate(filters):
+            operator = filter_item.get('operator', '=')
+            if operator not in OPERATORS:
+                raise ValueError(f"Operador desconhecido: {operator}")
+            conditions.append((filter_item['field'], operator))
+            if operator not in _VALUELESS_OPERATORS:
+                params[f'p{i}'] = _param_value(filter_item)
+        cursor = None
+        if cursor_values is not None:
+            cursor = 'value'
+            for i, value in enumerate(cursor_values):
+                if value is None and order_by != 'id' and i == 0:
+                    cursor = 'null'
+                    continue
+                params[f'cursor_{i}'] = value
+
+        shape: Shape = (tuple(conditions), order_by, descending, cursor)
+        stmt = self.plan(shape)
+
+        start = time.perf_counter()
+        result = await db.execute(stmt, params)
+        objs = result.scalars().all()
+        self._record(shape, time.perf_counter() - start)
+        return objs
+
+    def _record(self, shape: Shape, elapsed: float) -> None:
+        stats = self._stats.setdefault(shape, {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+        stats['count'] += 1
+        stats['total_seconds'] += elapsed
+        stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        result = []
+        for (conditions, order_by, descending, cursor), stats in self._stats.items():
+            result.append({
+                'shape': ' AND '.join(f'{field} {operator}' for field, operator in conditions) or '*',
+                'order_by': f"{order_by} {'desc' if descending else 'asc'}",
+                'cursor': cursor,
+                'count': stats['count'],
+                'avg_seconds': round(stats['total_seconds'] / stats['count'], 6),
+                'max_seconds': round(stats['max_seconds'], 6),
+            })
+        return result
@@ -1,3 +1,5 @@
+import json
+
 import streamlit as st
 import requests
 import pandas as pd
@@ -8,6 +10,23 @@ API_LIST = f"{API_BASE}?skip=0&limit=100"
 
 st.title("Cadastro de Carros")
 
+
+def get_condicional(url):
+    """
+    GET com If-None-Match: reaproveita a resposta guardada na sessão quando a
+    API responde 304 (tabela não mudou desde o último download).
+    """
+    cache = st.session_state.setdefault("respostas_etag", {})
+    headers = {}
+    if url in cache:
+        headers["If-None-Match"] = cache[url]["etag"]
+    response = requests.get(url, headers=headers)
+    if response.status_code == 304:
+        return 200, cache[url]["content"]
+    if response.status_code == 200 and "ETag" in response.headers:
+        cache[url] = {"etag": response.headers["ETag"], "content": response.content}
+    return response.status_code, response.content
+
 # --------------------
 # 📌 Cadastro de Carro
 # --------------------
@@ -46,16 +65,16 @@ with st.form("form_cadastro_carro"):
 with st.expander("Verificar Carros Cadastrados"):
     if st.button("Carregar Carros"):
         try:
-            response = requests.get(API_LIST)
-            if response.status_code == 200:
-                carros = response.json()
+            status_code, content = get_condicional(API_LIST)
+            if status_code == 200:
+                carros = json.loads(content)
                 if carros:
                     st.table(pd.DataFrame(carros))
                 else:
                     st.info("Nenhum carro cadastrado.")
             else:
-                st.error(f"Erro ao carregar carros: {response.status_code}")
-                st.text(response.text)
+                st.error(f"Erro ao carregar carros: {status_code}")
+                st.text(content.decode(errors="replace"))
         except Exception as e:
             st.error(f"Erro na requisição: {str(e)}")
 
@@ -134,25 +153,25 @@ with st.expander("📥 Importar carros via Excel"):
                 # 📄 Exportar PDF
 with st.expander("📤 Exportar Carros para PDF"):
     if st.button("Exportar PDF"):
-        r = requests.get(f"{API_BASE}/export-pdf")
-        if r.status_code == 200:
+        status_code, content = get_condicional(f"{API_BASE}/export-pdf")
+        if status_code == 200:
             with open("carros.pdf", "wb") as f:
-                f.write(r.content)
+                f.write(content)
             st.success("PDF exportado com sucesso!")
             with open("carros.pdf", "rb") as f:
                 st.download_button("Baixar PDF", f, file_name="carros.pdf")
         else:
-            st.error(f"Erro: {r.status_code}")
+            st.error(f"Erro: {status_code}")
 
 # 📦 Exportar Excel
 with st.expander("📤 Exportar Carros para Excel"):
     if st.button("Exportar Excel"):
-        response = requests.get(f"{API_BASE}/export-excel")
-        if response.status_code == 200:
+        status_code, content = get_condicional(f"{API_BASE}/export-excel")
+        if status_code == 200:
             with open("carros.xlsx", "wb") as f:
-                f.write(response.content)
+                f.write(content)
             st.success("Excel exportado com sucesso!")
             with open("carros.xlsx", "rb") as f:
                 st.download_button("Baixar Excel", f, file_name="carros.xlsx")
         else:
-            st.error(f"Erro: {response.status_code}")
+            st.error(f"Erro: {status_code}")
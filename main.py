@@ -3,13 +3,37 @@ from starlette.middleware.cors import CORSMiddleware
 import logging
 import uvicorn
 from api.api_v1.api import api_router
+from api.api_v1.endpoints.cars import pdf_renderer
+from api.deps import executor_211, executor_212
 from core.config import settings
+from core.db_pool import pool_stats, warm_up_pool
+from core.log_queue import QueueLogging
+from core.request import http_client_pool
+from core.xml_render import XmlRender
+from crud.crud_cars import crud_car
+from db.session import SessionLocal_psql
 from opentelemetry.instrumentation.logging import LoggingInstrumentor
 from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
 from fastapi.openapi.utils import get_openapi
 
 
+queue_logging = QueueLogging(
+    maxsize=settings.LOG_QUEUE_MAXSIZE,
+    max_length=settings.LOG_MAX_MESSAGE_LENGTH,
+    sample_every=settings.LOG_SAMPLE_EVERY,
+    sampled_loggers=settings.LOG_SAMPLED_LOGGERS,
+)
+
+
+def psql_engine():
+    return SessionLocal_psql.kw["bind"]
+
+
+async def warm_up_psql_pool():
+    await warm_up_pool(psql_engine(), [crud_car], connections=settings.PSQL_POOL_SIZE)
+
+
 def api_factory():
     app = FastAPI(title=settings.PROJECT_NAME,
                   root_path="/Template",
@@ -18,6 +42,8 @@ def api_factory():
                   )
     logging.config.dictConfig(settings.LOGGING_CONFIG)
     LoggingInstrumentor().instrument()
+    if settings.LOG_QUEUE_ENABLED:
+        queue_logging.start()
     HTTPXClientInstrumentor().instrument()
 
     # Set all CORS enabled origins
@@ -32,6 +58,14 @@ def api_factory():
         )
 
     app.include_router(api_router, prefix=settings.API_V1_STR)
+    app.add_event_handler("shutdown", pdf_renderer.shutdown)
+    app.add_event_handler("shutdown", XmlRender.shutdown_pool)
+    app.add_event_handler("shutdown", executor_211.shutdown)
+    app.add_event_handler("shutdown", executor_212.shutdown)
+    app.add_event_handler("shutdown", http_client_pool.aclose)
+    app.add_event_handler("shutdown", queue_logging.stop)
+    if settings.PSQL_POOL_WARMUP:
+        app.add_event_handler("startup", warm_up_psql_pool)
 
     return app
 
@@ -45,6 +79,21 @@ def get_index():
     return {'msg': 'API está no ar!'}
 
 
+@app.get(f"{app.root_path}/pool-stats", summary='Estatísticas do pool de conexões do Postgres')
+def get_pool_stats():
+    return pool_stats(psql_engine())
+
+
+@app.get(f"{app.root_path}/executor-stats", summary='Fila e concorrência das threads de cada SQL Server')
+def get_executor_stats():
+    return {executor.name: executor.stats() for executor in (executor_211, executor_212)}
+
+
+@app.get(f"{app.root_path}/log-stats", summary='Fila e descartes do logging assíncrono')
+def get_log_stats():
+    return queue_logging.stats()
+
+
 @app.get(f"{app.root_path}/docs", include_in_schema=False)
 async def custom_swagger_ui_html():
     return get_swagger_ui_html(openapi_url="/Template/openapi.json", title='API Docs')
@@ -1 +1,2 @@
-from .car_model import *
\ No newline at end of file
+from .car_model import *
+from .table_version_model import *
@@ -1,7 +1,15 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String, func, literal_column
 from db.base_class import Base
 
 
+# Texto pesquisável do carro. Deve ser idêntico à expressão do índice
+# trigram criado na migração, senão o Postgres não usa o índice; por isso os
+# literais são renderizados inline e não como parâmetros.
+def _search_document(modelo, nome, marca, versao):
+    space = literal_column("' '", String)
+    return func.coalesce(modelo, literal_column("''", String)) + space + nome + space + marca + space + versao
+
+
 class Car(Base):
     __tablename__ = 'Carrinhos'
     
@@ -12,3 +20,31 @@ class Car(Base):
     marca = Column(String(255), nullable=False)
     versao = Column(String(255), nullable=False)
     ano = Column(Integer, nullable=False)
+
+    # Criado na migração 0001_car_search_trgm; declarado aqui para o
+    # metadata (create_all, autogenerate) conhecer o índice
+    __table_args__ = (
+        Index(
+            'ix_Carrinhos_search_trgm',
+            _search_document(modelo, nome, marca, versao).label('search_document'),
+            postgresql_using='gin',
+            postgresql_ops={'search_document': 'gin_trgm_ops'},
+        ),
+    )
+
+
+class CarFacetCount(Base):
+    """
+    Contagem de carros por (marca, ano, cor), mantida por triggers na tabela
+    Carrinhos (migração 0002_car_facets). Qualquer faceta, filtrada ou não, é
+    uma soma sobre esta tabela, que tem uma linha por combinação existente.
+    """
+    __tablename__ = 'Carrinhos_facets'
+
+    marca = Column(String(255), primary_key=True)
+    ano = Column(Integer, primary_key=True)
+    cor = Column(String(255), primary_key=True)
+    total = Column(Integer, nullable=False)
+
+
+car_search_document = _search_document(Car.modelo, Car.nome, Car.marca, Car.versao)
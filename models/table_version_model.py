@@ -0,0 +1,28 @@
+from sqlalchemy import BigInteger, Column, DateTime, String
+from db.base_class import Base
+
+
+class TableVersionRow(Base):
+    """
+    Versão base de cada tabela monitorada (migração 0003_table_versions),
+    somada aos marcadores ainda não compactados de `TableVersionLogRow`.
+    Fica no banco para que todos os workers enxerguem as mesmas escritas.
+    """
+    __tablename__ = 'table_versions'
+
+    name = Column(String(255), primary_key=True)
+    version = Column(BigInteger, nullable=False)
+    modified_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class TableVersionLogRow(Base):
+    """
+    Marcador de escrita por transação (migração 0004_table_version_log). A
+    versão de uma tabela é `TableVersionRow.version` mais o número de
+    marcadores; os marcadores são compactados de tempos em tempos.
+    """
+    __tablename__ = 'table_version_log'
+
+    name = Column(String(255), primary_key=True)
+    txid = Column(BigInteger, primary_key=True)
+    modified_at = Column(DateTime(timezone=True), nullable=False)
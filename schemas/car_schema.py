@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Any, List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
 
 
 class CarBase(BaseModel):
@@ -21,6 +21,16 @@ class CarUpdate(BaseModel):
     cor: Optional[str] = None
 
 
+class CarBulkUpdateItem(CarUpdate):
+    id: int
+
+
+class CarBulkUpdateResult(BaseModel):
+    matched: List[int]
+    unmatched: List[int]
+    updated: int
+
+
 class CarInDbBase(CarBase):
     id: int
     
@@ -31,4 +41,45 @@ class Car(CarInDbBase):
     pass
 
 class CarRequest(CarBase):
-     pass
\ No newline at end of file
+     pass
+
+
+class CarSearchResult(Car):
+    rank: float
+
+
+class CarPage(BaseModel):
+    items: List[Car]
+    next_cursor: Optional[str] = None
+
+
+class CarBatchGet(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=10000)
+
+
+class CarFilter(BaseModel):
+    field: Literal["id", "modelo", "nome", "cor", "marca", "versao", "ano"]
+    operator: Literal["=", "!=", "<", "<=", ">", ">=", "like", "ilike", "in", "notin", "is_null", "not_null"] = "="
+    value: Any = None
+
+
+class CarSearch(BaseModel):
+    filters: List[CarFilter] = []
+    limit: int = Field(100, ge=1, le=1000)
+    cursor: Optional[str] = None
+    order_by: Literal["id", "modelo", "nome", "cor", "marca", "versao", "ano"] = "id"
+    desc: bool = False
+
+
+class CarDeleteMany(BaseModel):
+    ids: Optional[List[int]] = None
+    filters: Optional[List[CarFilter]] = None
+    batch_size: int = Field(5000, ge=1, le=50000)
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if (self.ids is None) == (self.filters is None):
+            raise ValueError("Informe ids ou filters")
+        if self.filters is not None and not self.filters:
+            raise ValueError("Informe ao menos um filtro")
+        return self
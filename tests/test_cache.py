@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from core.cache import LocalSharedCacheBackend, ReadThroughCache, SharedCacheBackend
+
+
+def test_incomplete_backend_fails_on_instantiation():
+    class OnlyGet(SharedCacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        OnlyGet()
+
+
+def test_set_with_current_token():
+    async def run():
+        cache = ReadThroughCache()
+        token = cache.token('Car:1')
+        await cache.set('Car:1', {'id': 1}, token=token)
+        return await cache.get('Car:1')
+
+    assert asyncio.run(run()) == {'id': 1}
+
+
+@pytest.mark.parametrize('invalidate', [
+    lambda cache: cache.delete('Car:1'),
+    lambda cache: cache.delete_prefix('Car:'),
+])
+def test_set_skipped_after_concurrent_invalidation(invalidate):
+    async def run():
+        cache = ReadThroughCache()
+        token = cache.token('Car:1')
+        # Escrita concluída enquanto a leitura do banco estava em andamento
+        await invalidate(cache)
+        await cache.set('Car:1', {'id': 1, 'nome': 'antigo'}, token=token)
+        return await cache.get('Car:1'), cache.stats()['skipped_sets']
+
+    assert asyncio.run(run()) == (None, 1)
+
+
+def test_invalidation_of_other_key_does_not_skip():
+    cache = ReadThroughCache()
+    # Uma chave em outra faixa de hash (o hash de str varia entre execuções)
+    other = next(f'Car:{i}' for i in range(2, 100) if cache._slot(f'Car:{i}') != cache._slot('Car:1'))
+
+    async def run():
+        token = cache.token('Car:1')
+        await cache.delete(other)
+        await cache.set('Car:1', {'id': 1}, token=token)
+        return await cache.get('Car:1')
+
+    assert asyncio.run(run()) == {'id': 1}
+
+
+def test_shared_backend_without_local_lru():
+    async def run():
+        cache = ReadThroughCache(shared=LocalSharedCacheBackend())
+        await cache.set('Car:1', {'id': 1})
+        first = await cache.get('Car:1')
+        await cache.delete('Car:1')
+        return first, await cache.get('Car:1')
+
+    assert asyncio.run(run()) == ({'id': 1}, None)
+    assert ReadThroughCache(shared=LocalSharedCacheBackend()).max_staleness == 0.0
+    assert ReadThroughCache(shared=LocalSharedCacheBackend(), ttl=60, local_ttl=2).max_staleness == 2
@@ -0,0 +1,64 @@
+import asyncio
+import io
+import zipfile
+
+from openpyxl import load_workbook
+
+from core.export_stream import stream_csv, stream_xlsx
+
+COLUMNS = ['id', 'modelo', 'ano', 'preco', 'ativo']
+CHUNKS = [
+    [(1, 'Civic <EXL> & cia', 2020, 129900.5, True)],
+    [(2, None, 2019, 0, False), (3, 'Gol', 2015, 35000, True)],
+]
+
+
+async def _chunks():
+    for rows in CHUNKS:
+        yield rows
+
+
+def _collect(stream):
+    async def collect():
+        return [part async for part in stream]
+
+    return asyncio.run(collect())
+
+
+def test_xlsx_round_trip():
+    parts = _collect(stream_xlsx(COLUMNS, _chunks(), sheet='Carros'))
+    workbook = load_workbook(io.BytesIO(b''.join(parts)), read_only=True)
+    assert workbook.sheetnames == ['Carros']
+    rows = list(workbook.active.iter_rows(values_only=True))
+    assert rows == [
+        tuple(COLUMNS),
+        (1, 'Civic <EXL> & cia', 2020, 129900.5, True),
+        (2, None, 2019, 0, False),
+        (3, 'Gol', 2015, 35000, True),
+    ]
+
+
+def test_xlsx_is_streamed_per_chunk():
+    parts = _collect(stream_xlsx(COLUMNS, _chunks()))
+    assert len(parts) > 1
+    assert zipfile.ZipFile(io.BytesIO(b''.join(parts))).testzip() is None
+
+
+def test_xlsx_without_rows():
+    async def empty():
+        return
+        yield
+
+    parts = _collect(stream_xlsx(COLUMNS, empty()))
+    rows = list(load_workbook(io.BytesIO(b''.join(parts)), read_only=True).active.iter_rows(values_only=True))
+    assert rows == [tuple(COLUMNS)]
+
+
+def test_csv():
+    parts = _collect(stream_csv(COLUMNS, _chunks()))
+    assert b''.join(parts).decode('utf-8').splitlines() == [
+        'id,modelo,ano,preco,ativo',
+        '1,Civic <EXL> & cia,2020,129900.5,True',
+        '2,,2019,0,False',
+        '3,Gol,2015,35000,True',
+    ]
@@ -0,0 +1,44 @@
+from core.http_cache import http_date, not_modified
+
+ETAG = 'W/"12.18b2f5c3a10-json"'
+LAST_MODIFIED = 1_700_000_000.5
+
+
+def test_without_conditional_headers():
+    assert not not_modified({}, ETAG, LAST_MODIFIED)
+
+
+def test_if_none_match_matching_etag():
+    assert not_modified({'if-none-match': ETAG}, ETAG, LAST_MODIFIED)
+
+
+def test_if_none_match_strong_form_of_weak_etag():
+    assert not_modified({'if-none-match': '"12.18b2f5c3a10-json"'}, ETAG, LAST_MODIFIED)
+
+
+def test_if_none_match_list_and_wildcard():
+    assert not_modified({'if-none-match': '"outro", ' + ETAG}, ETAG, LAST_MODIFIED)
+    assert not_modified({'if-none-match': '*'}, ETAG, LAST_MODIFIED)
+
+
+def test_if_none_match_other_etag():
+    assert not not_modified({'if-none-match': 'W/"11.18b2f5c3a10-json"'}, ETAG, LAST_MODIFIED)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    headers = {'if-none-match': 'W/"outro"', 'if-modified-since': http_date(LAST_MODIFIED + 60)}
+    assert not not_modified(headers, ETAG, LAST_MODIFIED)
+
+
+def test_if_modified_since():
+    # A data HTTP tem resolução de segundos: a fração de `last_modified` é ignorada
+    assert not_modified({'if-modified-since': http_date(LAST_MODIFIED)}, ETAG, LAST_MODIFIED)
+    assert not not_modified({'if-modified-since': http_date(LAST_MODIFIED - 1)}, ETAG, LAST_MODIFIED)
+
+
+def test_invalid_if_modified_since():
+    assert not not_modified({'if-modified-since': 'ontem'}, ETAG, LAST_MODIFIED)
+
+
+def test_http_date():
+    assert http_date(0) == 'Thu, 01 Jan 1970 00:00:00 GMT'
@@ -0,0 +1,54 @@
+import logging
+
+from core.log_queue import SamplingFilter, TruncateFilter
+
+
+def _record(msg, *args, level=logging.INFO):
+    return logging.LogRecord('crud.base', level, __file__, 1, msg, args or None, None)
+
+
+def test_truncate_long_message():
+    record = _record('corpo %s', 'x' * 50)
+    assert TruncateFilter(max_length=10).filter(record)
+    assert record.getMessage() == 'corpo xxxx... [46 caracteres omitidos]'
+    assert record.args is None
+
+
+def test_truncate_keeps_short_message_lazy():
+    record = _record('Obtendo %s de id=%s', 'Car', 1)
+    assert TruncateFilter(max_length=100).filter(record)
+    assert record.msg == 'Obtendo %s de id=%s'
+    assert record.args == ('Car', 1)
+
+
+def test_truncate_leaves_bad_arguments_to_the_handler():
+    record = _record('%d', 'não é número')
+    assert TruncateFilter(max_length=1).filter(record)
+    assert record.msg == '%d'
+
+
+def test_sampling_one_in_every_per_template():
+    sampling = SamplingFilter(every=3)
+    kept = [sampling.filter(_record('Obtendo %s de id=%s', 'Car', i)) for i in range(7)]
+    assert kept == [True, False, False, True, False, False, True]
+    assert sampling.filter(_record('Outro template'))
+    assert sampling.dropped == 4
+
+
+def test_sampling_never_drops_warnings():
+    sampling = SamplingFilter(every=100)
+    assert all(sampling.filter(_record('Falha %s', i, level=logging.WARNING)) for i in range(5))
+    assert sampling.dropped == 0
+
+
+def test_sampling_disabled():
+    sampling = SamplingFilter(every=1)
+    assert all(sampling.filter(_record('msg')) for _ in range(5))
+
+
+def test_sampling_bounds_templates():
+    sampling = SamplingFilter(every=2)
+    sampling.max_templates = 4
+    for i in range(10):
+        sampling.filter(_record(f'template {i}'))
+    assert len(sampling._counts) <= 4
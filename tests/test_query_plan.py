@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import declarative_base
+
+from crud.query_plan import FilterPlanCache, build_conditions, decode_cursor, encode_cursor
+
+Base = declarative_base()
+
+
+class Carro(Base):
+    __tablename__ = 'carros'
+
+    id = Column(Integer, primary_key=True)
+    modelo = Column(String(255))
+    marca = Column(String(255), nullable=False)
+    ano = Column(Integer, nullable=False)
+
+
+class _Result:
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+
+class _Session:
+    """
+    Registra o statement e os parâmetros de cada `execute`.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    async def execute(self, stmt, params):
+        self.calls.append((stmt, params))
+        return _Result()
+
+
+def _execute(plans, db, **kwargs):
+    return asyncio.run(plans.execute(db, limit=kwargs.pop('limit', 10), **kwargs))
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor('modelo', True, 'Civic', 42)
+    assert decode_cursor(cursor) == ('modelo', True, 'Civic', 42)
+    assert decode_cursor(encode_cursor('modelo', False, None, 7)) == ('modelo', False, None, 7)
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor('modelo', False, '?>?>?>', 1)
+    assert set(cursor) <= set('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_=')
+
+
+@pytest.mark.parametrize('cursor', ['', 'nao-e-base64!', encode_cursor('id', False, 1, 2)[:-4]])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_same_shape_reuses_plan():
+    plans = FilterPlanCache(Carro)
+    db = _Session()
+    _execute(plans, db, filters=[{'field': 'marca', 'operator': '=', 'value': 'Honda'}])
+    _execute(plans, db, filters=[{'field': 'marca', 'operator': '=', 'value': 'Fiat'}])
+    (first, first_params), (second, second_params) = db.calls
+    assert first is second
+    assert first_params == {'limit': 10, 'p0': 'Honda'}
+    assert second_params == {'limit': 10, 'p0': 'Fiat'}
+
+
+def test_in_list_size_does_not_change_shape():
+    plans = FilterPlanCache(Carro)
+    db = _Session()
+    _execute(plans, db, filters=[{'field': 'ano', 'operator': 'in', 'value': [2020]}])
+    _execute(plans, db, filters=[{'field': 'ano', 'operator': 'in', 'value': [2019, 2020, 2021]}])
+    assert db.calls[0][0] is db.calls[1][0]
+    assert db.calls[1][1]['p0'] == [2019, 2020, 2021]
+
+
+def test_shape_includes_operator_order_and_cursor():
+    plans = FilterPlanCache(Carro)
+    db = _Session()
+    filters = [{'field': 'marca', 'operator': '=', 'value': 'Honda'}]
+    _execute(plans, db, filters=filters)
+    _execute(plans, db, filters=[{'field': 'marca', 'operator': '!=', 'value': 'Honda'}])
+    _execute(plans, db, filters=filters, order_by='ano')
+    _execute(plans, db, filters=filters, order_by='ano', descending=True)
+    _execute(plans, db, filters=filters, order_by='modelo', cursor_values=['Civic', 3])
+    _execute(plans, db, filters=filters, order_by='modelo', cursor_values=[None, 3])
+    statements = [stmt for stmt, _ in db.calls]
+    assert len({id(stmt) for stmt in statements}) == len(statements)
+    assert [entry['cursor'] for entry in plans.stats()] == [None, None, None, None, 'value', 'null']
+
+
+def test_null_cursor_value_is_not_bound():
+    plans = FilterPlanCache(Carro)
+    db = _Session()
+    _execute(plans, db, filters=[], order_by='modelo', cursor_values=[None, 3])
+    assert db.calls[0][1] == {'limit': 10, 'cursor_1': 3}
+
+
+def test_valueless_operators_bind_nothing():
+    plans = FilterPlanCache(Carro)
+    db = _Session()
+    _execute(plans, db, filters=[{'field': 'modelo', 'operator': 'is_null'}])
+    assert db.calls[0][1] == {'limit': 10}
+
+
+def test_plans_are_evicted_in_lru_order():
+    plans = FilterPlanCache(Carro, maxsize=2)
+    db = _Session()
+    for field in ('marca', 'modelo', 'marca', 'ano'):
+        _execute(plans, db, filters=[{'field': field, 'operator': '=', 'value': 1}])
+    assert [entry['shape'] for entry in plans.stats()] == ['marca =', 'ano =']
+
+
+def test_stats_per_shape():
+    plans = FilterPlanCache(Carro)
+    db = _Session()
+    for _ in range(3):
+        _execute(plans, db, filters=[{'field': 'marca', 'operator': 'like', 'value': 'H%'}],
+                 order_by='ano', descending=True)
+    (entry,) = plans.stats()
+    assert entry['shape'] == 'marca like'
+    assert entry['order_by'] == 'ano desc'
+    assert entry['count'] == 3
+
+
+def test_unknown_operator():
+    with pytest.raises(ValueError):
+        _execute(FilterPlanCache(Carro), _Session(), filters=[{'field': 'marca', 'operator': '~', 'value': 1}])
+
+
+def test_unknown_column():
+    with pytest.raises(ValueError):
+        _execute(FilterPlanCache(Carro), _Session(), filters=[{'field': 'senha', 'operator': '=', 'value': 1}])
+
+
+def test_build_conditions_requires_list_for_in():
+    with pytest.raises(ValueError):
+        build_conditions(Carro, [{'field': 'ano', 'operator': 'in', 'value': 2020}])
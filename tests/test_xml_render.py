@@ -0,0 +1,108 @@
+import asyncio
+
+from core.xml_render import XmlRender
+
+RESPONSE = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" xmlns:c="urn:carros">'
+    b'<soap:Body><c:Lista>'
+    b'<c:Carro id="1"><c:Modelo>Civic</c:Modelo><c:Marca>Honda</c:Marca></c:Carro>'
+    b'<!-- comentario -->'
+    b'<c:Carro id="2"><c:Modelo>Gol</c:Modelo><c:Marca>VW</c:Marca></c:Carro>'
+    b'<Carro id="3"><Modelo>Onix</Modelo><Marca>Chevrolet</Marca></Carro>'
+    b'</c:Lista></soap:Body></soap:Envelope>'
+)
+
+
+def _describe(record):
+    # Registros são liberados quando o consumidor avança: extrai os dados na hora
+    return record.tag, dict(record.attrib), [(child.tag, child.text) for child in record]
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_records_without_namespaces():
+    assert [_describe(r) for r in XmlRender.iter_sanitized_records(RESPONSE, 'Carro')] == [
+        ('Carro', {'id': '1'}, [('Modelo', 'Civic'), ('Marca', 'Honda')]),
+        ('Carro', {'id': '2'}, [('Modelo', 'Gol'), ('Marca', 'VW')]),
+        ('Carro', {'id': '3'}, [('Modelo', 'Onix'), ('Marca', 'Chevrolet')]),
+    ]
+
+
+def test_chunk_boundaries_do_not_matter():
+    expected = [_describe(r) for r in XmlRender.iter_sanitized_records(RESPONSE, 'Carro')]
+    for size in (1, 7, 64):
+        records = XmlRender.iter_sanitized_records(_chunks(RESPONSE, size), 'Carro')
+        assert [_describe(r) for r in records] == expected
+
+
+def test_accepts_str():
+    records = list(XmlRender.iter_sanitized_records(RESPONSE.decode('utf-8').split('?>', 1)[1], 'Modelo'))
+    assert len(records) == 3
+
+
+def test_consumed_records_are_freed():
+    for record in XmlRender.iter_sanitized_records(_chunks(RESPONSE, 16), 'Carro'):
+        # Do que já foi consumido sobra no máximo o registro anterior, vazio
+        previous = record.getprevious()
+        if previous is not None:
+            assert len(previous) == 0 and not previous.attrib
+            assert previous.getprevious() is None
+
+
+def test_no_matching_records():
+    assert list(XmlRender.iter_sanitized_records(RESPONSE, 'Moto')) == []
+
+
+def test_async_matches_sync():
+    async def body():
+        for chunk in _chunks(RESPONSE, 10):
+            yield chunk
+
+    async def collect():
+        return [_describe(record) async for record in XmlRender.aiter_sanitized_records(body(), 'Carro')]
+
+    assert asyncio.run(collect()) == [_describe(r) for r in XmlRender.iter_sanitized_records(RESPONSE, 'Carro')]
+
+
+TEMPLATE = '''<envio>
+    <!-- cabeçalho -->
+    <nome>{{ nome }}</nome>
+    {% for opcional in opcionais %}
+    <opcional>{{ opcional.nome }}</opcional>
+    {% endfor %}
+</envio>
+'''
+
+
+def _render_batch_both_ways(monkeypatch, tmp_path, clean_output):
+    (tmp_path / 'carro.xml').write_text(TEMPLATE, encoding='utf-8')
+    monkeypatch.setattr(XmlRender, 'templates_path', str(tmp_path))
+    monkeypatch.setattr(XmlRender, 'clean_output', clean_output)
+    monkeypatch.setattr(XmlRender, 'batch_chunk_size', 2)
+    payloads = [{'nome': f' Carro & {i} ', 'opcionais': [{'nome': ' Teto '}]} for i in range(5)]
+
+    monkeypatch.setattr(XmlRender, 'parallel_threshold', len(payloads) + 1)
+    inline = asyncio.run(XmlRender.render_batch('carro', payloads))
+    monkeypatch.setattr(XmlRender, 'parallel_threshold', 1)
+    try:
+        pooled = asyncio.run(XmlRender.render_batch('carro', payloads))
+    finally:
+        XmlRender.shutdown_pool()
+    return payloads, inline, pooled
+
+
+def test_pooled_batch_matches_inline_without_cleaning(monkeypatch, tmp_path):
+    payloads, inline, pooled = _render_batch_both_ways(monkeypatch, tmp_path, clean_output=False)
+    assert pooled == inline
+    assert '<!-- cabeçalho -->' in inline[0]
+    assert '<nome>Carro &amp; 0</nome>' in inline[0]
+    assert payloads[0] == {'nome': ' Carro & 0 ', 'opcionais': [{'nome': ' Teto '}]}
+
+
+def test_pooled_batch_matches_inline_with_cleaning(monkeypatch, tmp_path):
+    _, inline, pooled = _render_batch_both_ways(monkeypatch, tmp_path, clean_output=True)
+    assert pooled == inline
+    assert inline[0] == '<envio><nome>Carro &amp; 0</nome><opcional>Teto</opcional></envio>'